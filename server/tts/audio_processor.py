@@ -5,35 +5,70 @@ Handles audio extraction, mixing, and synchronization for dubbed content.
 """
 import sys
 import os
+import re
 import json
 import subprocess
 import tempfile
 import shutil
 
+try:
+    import av
+    import numpy as np
+    import scipy.signal as sps
+    HAS_INPROC_MIX = True
+except ImportError:
+    HAS_INPROC_MIX = False
+
+
+_FILTER_SCRIPT_CACHE = {}
+
+
+def get_filter_complex_script(filter_complex: str) -> str:
+    """
+    Write a filter_complex graph to a script file and cache it per graph.
+    Identical graphs across a batch reuse the same file, so ffmpeg can be
+    pointed at -filter_complex_script instead of re-receiving the graph
+    on the command line every call.
+    """
+    path = _FILTER_SCRIPT_CACHE.get(filter_complex)
+    if path is None or not os.path.exists(path):
+        fd, path = tempfile.mkstemp(prefix="filtergraph_", suffix=".gr")
+        with os.fdopen(fd, "w") as f:
+            f.write(filter_complex)
+        _FILTER_SCRIPT_CACHE[filter_complex] = path
+    return path
+
 
 def run_ffmpeg(args: list, description: str = "FFmpeg operation") -> dict:
     """Run FFmpeg command and capture output."""
     try:
         cmd = ["ffmpeg", "-y"] + args
         print(f"Running: {' '.join(cmd)}", file=sys.stderr)
-        
-        result = subprocess.run(
+
+        # Plain Popen (no shell, no preexec_fn) uses posix_spawn; stdout is
+        # unused so send it to /dev/null, and only decode stderr on failure
+        # instead of paying for text conversion of chatty ffmpeg logs.
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
-            text=True,
-            timeout=600
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
         )
-        
-        if result.returncode != 0:
+        try:
+            _, stderr = proc.communicate(timeout=600)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return {"success": False, "error": f"{description} timed out"}
+
+        if proc.returncode != 0:
+            error_text = stderr.decode("utf-8", errors="replace") if stderr else ""
             return {
                 "success": False,
-                "error": result.stderr or f"{description} failed with code {result.returncode}"
+                "error": error_text or f"{description} failed with code {proc.returncode}"
             }
-        
+
         return {"success": True}
-        
-    except subprocess.TimeoutExpired:
-        return {"success": False, "error": f"{description} timed out"}
+
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -82,52 +117,95 @@ def get_audio_info(file_path: str) -> dict:
 
 def analyze_audio_loudness(file_path: str) -> dict:
     """
-    Analyze audio loudness using FFmpeg loudnorm filter.
+    Analyze audio loudness using the FFmpeg ebur128 meter.
     Returns loudness metrics for adaptive volume control.
+
+    Results are memoized in a sidecar file keyed on (mtime, size) so
+    reusing the same original/TTS track across renders skips the analysis.
     """
+    sidecar_path = file_path + ".loudness.json"
+    cache_key = None
+    try:
+        st = os.stat(file_path)
+        cache_key = [st.st_mtime_ns, st.st_size]
+        with open(sidecar_path, "r") as f:
+            cached = json.load(f)
+        if cached.get("key") == cache_key:
+            return cached["data"]
+    except (OSError, ValueError, KeyError):
+        pass
+
     try:
         cmd = [
-            "ffmpeg", "-i", file_path, "-af", 
-            "loudnorm=I=-16:TP=-1.5:LRA=11:print_format=json",
+            "ffmpeg", "-i", file_path, "-af",
+            "ebur128=metadata=1:peak=true",
             "-f", "null", "-"
         ]
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        
+
         output = result.stderr
-        
-        json_start = output.rfind('{')
-        json_end = output.rfind('}') + 1
-        
-        if json_start >= 0 and json_end > json_start:
-            loudness_json = output[json_start:json_end]
-            loudness_data = json.loads(loudness_json)
-            
-            return {
-                "success": True,
-                "input_i": float(loudness_data.get("input_i", -23)),
-                "input_tp": float(loudness_data.get("input_tp", -1)),
-                "input_lra": float(loudness_data.get("input_lra", 7)),
-                "input_thresh": float(loudness_data.get("input_thresh", -33)),
-                "target_offset": float(loudness_data.get("target_offset", 0))
-            }
-        
-        return {
+
+        def last_value(pattern: str, default: float) -> float:
+            matches = re.findall(pattern, output)
+            return float(matches[-1]) if matches else default
+
+        integrated = last_value(r"I:\s*(-?\d+\.\d+)\s*LUFS", -23.0)
+
+        # The summary prints two Threshold lines (integrated loudness
+        # block first, then loudness range); the integrated one is wanted
+        thresh_match = re.search(r"Threshold:\s*(-?\d+\.\d+)\s*LUFS", output)
+
+        data = {
             "success": True,
-            "input_i": -23.0,
-            "input_tp": -1.0,
-            "input_lra": 7.0,
-            "input_thresh": -33.0,
+            "input_i": integrated,
+            "input_tp": last_value(r"Peak:\s*(-?\d+\.\d+)\s*dBFS", -1.0),
+            "input_lra": last_value(r"LRA:\s*(-?\d+\.\d+)\s*LU", 7.0),
+            "input_thresh": float(thresh_match.group(1)) if thresh_match else -33.0,
             "target_offset": 0.0
         }
-        
+
+        if cache_key is not None:
+            try:
+                tmp_path = sidecar_path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"key": cache_key, "data": data}, f)
+                os.replace(tmp_path, sidecar_path)
+            except OSError:
+                pass
+
+        return data
+
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+def get_audio_stream_params(file_path: str) -> dict:
+    """Get channel count and sample rate of the first audio stream."""
+    try:
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "a:0",
+            "-show_entries", "stream=channels,sample_rate",
+            "-of", "json",
+            file_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode == 0:
+            streams = json.loads(result.stdout).get("streams", [])
+            if streams:
+                return {
+                    "channels": int(streams[0].get("channels", 0)),
+                    "sample_rate": int(streams[0].get("sample_rate", 0))
+                }
+    except:
+        pass
+    return {"channels": 0, "sample_rate": 0}
+
+
 def extract_audio(video_path: str, output_path: str, format: str = "mp3") -> dict:
     """
     Extract audio from video file.
-    
+
     Args:
         video_path: Path to video file
         output_path: Path for output audio file
@@ -139,15 +217,24 @@ def extract_audio(video_path: str, output_path: str, format: str = "mp3") -> dic
         "aac": ["-acodec", "aac", "-b:a", "192k"],
         "m4a": ["-acodec", "aac", "-b:a", "192k"]
     }
-    
+
     codec_args = codec_map.get(format, codec_map["mp3"])
-    
+
+    # Only resample/remap channels when the source doesn't already fit:
+    # upmixing mono to stereo doubles the data for nothing, and a matching
+    # sample rate makes the resampler a no-op we can skip entirely.
+    source = get_audio_stream_params(video_path)
+    layout_args = []
+    if source["sample_rate"] != 44100:
+        layout_args += ["-ar", "44100"]
+    if source["channels"] not in (1, 2):
+        layout_args += ["-ac", "2"]
+
     args = [
         "-i", video_path,
         "-vn",
         *codec_args,
-        "-ar", "44100",
-        "-ac", "2",
+        *layout_args,
         output_path
     ]
     
@@ -176,12 +263,31 @@ def adjust_audio_speed(input_path: str, output_path: str, target_duration: float
         return {"success": False, "error": "Could not determine audio duration"}
     
     speed_factor = current_duration / target_duration
-    
+
     if speed_factor < 0.5:
         speed_factor = 0.5
     elif speed_factor > 2.0:
         speed_factor = 2.0
-    
+
+    # Within ~2% the atempo pass is inaudible — skip the encode entirely
+    # and just link/copy the input into place.
+    if 0.98 <= speed_factor <= 1.02:
+        try:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            os.link(input_path, output_path)
+        except OSError:
+            shutil.copy(input_path, output_path)
+        return {
+            "success": True,
+            "output_file": output_path,
+            "original_duration": current_duration,
+            "target_duration": target_duration,
+            "speed_factor": 1.0,
+            "new_duration": current_duration,
+            "skipped": True
+        }
+
     args = [
         "-i", input_path,
         "-filter:a", f"atempo={speed_factor}",
@@ -221,11 +327,12 @@ def mix_audio_tracks(
     """
     codec_args = ["-acodec", "aac", "-b:a", "192k"] if output_format == "aac" else ["-acodec", "libmp3lame", "-q:a", "2"]
     
+    filter_complex = f"[0:a]volume={original_volume}[a1];[1:a]volume={dubbed_volume}[a2];[a1][a2]amix=inputs=2:duration=longest"
+
     args = [
         "-i", original_audio,
         "-i", dubbed_audio,
-        "-filter_complex",
-        f"[0:a]volume={original_volume}[a1];[1:a]volume={dubbed_volume}[a2];[a1][a2]amix=inputs=2:duration=longest",
+        "-filter_complex_script", get_filter_complex_script(filter_complex),
         *codec_args,
         output_path
     ]
@@ -271,6 +378,11 @@ def mix_audio_adaptive(
     
     dubbed_adjust = max(-20, min(20, dubbed_adjust))
     bg_adjust = max(-30, min(6, bg_adjust))
+
+    # Quantize to 0.5 dB steps so identical graphs repeat across a batch
+    # and hit the filter script cache (inaudible difference).
+    dubbed_adjust = round(dubbed_adjust * 2) / 2
+    bg_adjust = round(bg_adjust * 2) / 2
     
     print(f"Original LUFS: {original_lufs:.1f}, Dubbed LUFS: {dubbed_lufs:.1f}", file=sys.stderr)
     print(f"Adaptive adjustment: bg={bg_adjust:+.1f}dB, dubbed={dubbed_adjust:+.1f}dB", file=sys.stderr)
@@ -286,11 +398,11 @@ def mix_audio_adaptive(
     args = [
         "-i", original_audio,
         "-i", dubbed_audio,
-        "-filter_complex", filter_complex,
+        "-filter_complex_script", get_filter_complex_script(filter_complex),
         *codec_args,
         output_path
     ]
-    
+
     result = run_ffmpeg(args, "Adaptive audio mixing")
     
     if result["success"]:
@@ -306,6 +418,152 @@ def mix_audio_adaptive(
     return result
 
 
+INPROC_MIX_MAX_SECONDS = 30.0
+INPROC_SAMPLE_RATE = 48000
+
+
+def decode_audio_to_mono(file_path: str):
+    """Decode an audio file to a mono float32 array at the in-process mix rate."""
+    resampler = av.AudioResampler(format="fltp", layout="mono", rate=INPROC_SAMPLE_RATE)
+    chunks = []
+    with av.open(file_path) as container:
+        for frame in container.decode(audio=0):
+            resampled = resampler.resample(frame)
+            if resampled is None:
+                continue
+            if not isinstance(resampled, list):
+                resampled = [resampled]
+            for out_frame in resampled:
+                chunks.append(out_frame.to_ndarray().reshape(-1).astype(np.float32))
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks)
+
+
+def _integrated_loudness(samples, rate: int) -> float:
+    """BS.1770-4 integrated loudness of a mono buffer in LUFS.
+
+    K-weighting (shelf + RLB high-pass, coefficients for 48kHz) followed
+    by gated 400ms block energies; mirrors what ffmpeg's loudnorm measures.
+    """
+    block = int(0.4 * rate)
+    if len(samples) < block:
+        return -70.0
+    shelf_b = [1.53512485958697, -2.69169618940638, 1.19839281085285]
+    shelf_a = [1.0, -1.69065929318241, 0.73248077421585]
+    hp_b = [1.0, -2.0, 1.0]
+    hp_a = [1.0, -1.99004745483398, 0.99007225036621]
+    x = sps.lfilter(hp_b, hp_a, sps.lfilter(shelf_b, shelf_a, samples))
+
+    # 75%-overlapped block energies via one cumulative sum
+    hop = block // 4
+    csum = np.concatenate(([0.0], np.cumsum(np.square(x))))
+    starts = np.arange(0, len(x) - block + 1, hop)
+    z = (csum[starts + block] - csum[starts]) / block
+    lk = -0.691 + 10 * np.log10(np.maximum(z, 1e-12))
+
+    mask = lk > -70.0  # absolute gate
+    if not mask.any():
+        return -70.0
+    gamma_r = -0.691 + 10 * np.log10(z[mask].mean()) - 10.0  # relative gate
+    mask &= lk > gamma_r
+    if not mask.any():
+        return -70.0
+    return -0.691 + 10 * np.log10(z[mask].mean())
+
+
+def mix_audio_adaptive_inproc(
+    original_audio: str,
+    dubbed_audio: str,
+    output_path: str,
+    output_format: str = "aac"
+) -> dict:
+    """
+    In-process adaptive mix for short TTS clips.
+
+    For tracks under ~30s the ffmpeg fork+exec and filter setup dominate
+    the actual mixing work, so decode both streams with PyAV, apply the
+    gains and background bandpass in NumPy/SciPy, and encode once.
+    Falls back to the subprocess path for long inputs or on any failure.
+    """
+    original_duration = get_audio_duration(original_audio)
+    dubbed_duration = get_audio_duration(dubbed_audio)
+
+    if (not HAS_INPROC_MIX
+            or original_duration <= 0 or dubbed_duration <= 0
+            or max(original_duration, dubbed_duration) > INPROC_MIX_MAX_SECONDS):
+        return mix_audio_adaptive(original_audio, dubbed_audio, output_path, output_format)
+
+    try:
+        original_loudness = analyze_audio_loudness(original_audio)
+        dubbed_loudness = analyze_audio_loudness(dubbed_audio)
+
+        original_lufs = original_loudness.get("input_i", -23)
+        dubbed_lufs = dubbed_loudness.get("input_i", -16)
+
+        dubbed_adjust = max(-20, min(20, -14 - dubbed_lufs))
+        bg_adjust = max(-30, min(6, -30 - original_lufs))
+
+        bg = decode_audio_to_mono(original_audio)
+        dubbed = decode_audio_to_mono(dubbed_audio)
+
+        # Same shaping as the subprocess graph: bandpass the background,
+        # apply both gains, sum with amix's 1/n input scaling.
+        sos = sps.butter(4, [80, 8000], btype="band", fs=INPROC_SAMPLE_RATE, output="sos")
+        bg = sps.sosfilt(sos, bg).astype(np.float32)
+        bg *= np.float32(10 ** (bg_adjust / 20))
+        dubbed = dubbed * np.float32(10 ** (dubbed_adjust / 20))
+
+        length = max(len(bg), len(dubbed))
+        mix = np.zeros(length, dtype=np.float32)
+        mix[:len(bg)] += bg
+        mix[:len(dubbed)] += dubbed
+        mix *= np.float32(0.5)
+
+        # Equivalent of the graph's trailing loudnorm=I=-16:TP=-1.5: one
+        # static gain to the integrated target, then a true-peak cap
+        # (4x oversampled peak estimate), so in-process clips land at the
+        # same loudness as ffmpeg-mixed ones in the same render
+        loudness = _integrated_loudness(mix, INPROC_SAMPLE_RATE)
+        if loudness > -70.0:
+            mix *= np.float32(10 ** ((-16.0 - loudness) / 20))
+        true_peak = np.abs(sps.resample_poly(mix, 4, 1)).max() if length else 0.0
+        tp_limit = 10 ** (-1.5 / 20)
+        if true_peak > tp_limit:
+            mix *= np.float32(tp_limit / true_peak)
+
+        codec = "aac" if output_format == "aac" else "libmp3lame"
+        with av.open(output_path, "w") as container:
+            stream = container.add_stream(codec, rate=INPROC_SAMPLE_RATE)
+            stream.bit_rate = 192000
+            frame_size = 1024
+            for start in range(0, length, frame_size):
+                chunk = np.ascontiguousarray(mix[start:start + frame_size])
+                frame = av.AudioFrame.from_ndarray(chunk.reshape(1, -1), format="fltp", layout="mono")
+                frame.sample_rate = INPROC_SAMPLE_RATE
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+            for packet in stream.encode(None):
+                container.mux(packet)
+
+        return {
+            "success": True,
+            "output_file": output_path,
+            "duration": length / INPROC_SAMPLE_RATE,
+            "adaptive_volume": {
+                "original_lufs": original_lufs,
+                "dubbed_lufs": dubbed_lufs,
+                "bg_adjustment_db": bg_adjust,
+                "dubbed_adjustment_db": dubbed_adjust
+            },
+            "inproc": True
+        }
+
+    except Exception as e:
+        print(f"In-process mix failed ({e}), falling back to ffmpeg", file=sys.stderr)
+        return mix_audio_adaptive(original_audio, dubbed_audio, output_path, output_format)
+
+
 def replace_video_audio(
     video_path: str,
     audio_path: str,
@@ -324,11 +582,11 @@ def replace_video_audio(
         original_volume: Volume for original audio if kept
     """
     if keep_original:
+        filter_complex = f"[0:a]volume={original_volume}[a1];[1:a]volume=1.0[a2];[a1][a2]amix=inputs=2:duration=longest[aout]"
         args = [
             "-i", video_path,
             "-i", audio_path,
-            "-filter_complex",
-            f"[0:a]volume={original_volume}[a1];[1:a]volume=1.0[a2];[a1][a2]amix=inputs=2:duration=longest[aout]",
+            "-filter_complex_script", get_filter_complex_script(filter_complex),
             "-map", "0:v",
             "-map", "[aout]",
             "-c:v", "copy",
@@ -409,7 +667,7 @@ def create_dubbed_audio_track(
                 return extract_result
             
             if use_adaptive_volume:
-                result = mix_audio_adaptive(
+                result = mix_audio_adaptive_inproc(
                     extracted_audio,
                     adjusted_tts,
                     output_path,
@@ -425,7 +683,14 @@ def create_dubbed_audio_track(
                     output_format=output_format
                 )
         else:
-            shutil.copy(adjusted_tts, output_path)
+            # Same-filesystem hard link is O(1) vs a full read+write copy;
+            # the link survives the temp dir cleanup below.
+            try:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                os.link(adjusted_tts, output_path)
+            except OSError:
+                shutil.copy(adjusted_tts, output_path)
             result = {
                 "success": True,
                 "output_file": output_path,
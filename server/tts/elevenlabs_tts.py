@@ -6,13 +6,49 @@ Requires ELEVENLABS_API_KEY environment variable.
 """
 import sys
 import os
+import re
 import json
+import hashlib
+import functools
 import requests
 import tempfile
+import shutil
 import subprocess
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+    import aiofiles
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
 
 API_BASE = "https://api.elevenlabs.io/v1"
 
+# Concurrent TTS requests; keep within the ElevenLabs concurrency tier
+TTS_CONCURRENCY = int(os.environ.get("ELEVEN_TTS_CONCURRENCY", "8"))
+
+# Shared session so concurrent workers reuse keep-alive connections
+# instead of paying a TLS handshake per request.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    # Transient 429/5xx are retried here so a rate-limited segment recovers
+    # instead of leaving a silent gap in the dub; Retry-After is honoured
+    # when ElevenLabs sends it.
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.4,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        allowed_methods=frozenset(["GET", "POST"])
+    )
+))
+
 # High-quality voices for dubbing (pre-made voices)
 # These are voice IDs for ElevenLabs' pre-made voices
 VOICE_MAP = {
@@ -44,6 +80,83 @@ LANGUAGE_VOICES = {
     "en": {"male": "pNInz6obpgDQGcFmaJgB", "female": "EXAVITQu4vr4xnSDxMaL"},
 }
 
+# On-disk synthesis cache: identical (text, voice, settings) tuples are
+# served from here instead of re-paying the API call and character quota.
+CACHE_DIR = os.environ.get("ELEVEN_TTS_CACHE", "/tmp/eleven_cache")
+CACHE_MAX_BYTES = int(os.environ.get("ELEVEN_TTS_CACHE_MAX_MB", "500")) * 1024 * 1024
+
+
+def _cache_path(text: str, voice_id: str, stability: float, similarity_boost: float,
+                style: float, use_speaker_boost: bool) -> str:
+    """Build the cache file path for one synthesis request."""
+    key = hashlib.sha256(json.dumps({
+        "t": text,
+        "v": voice_id,
+        "s": stability,
+        "sb": similarity_boost,
+        "st": style,
+        "sp": use_speaker_boost,
+        "m": "eleven_multilingual_v2"
+    }, sort_keys=True).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, key[:2], key + ".mp3")
+
+
+def _copy_from_cache(cache_path: str, output_file: str):
+    """Materialise a cache entry at output_file (hardlink, copy fallback)."""
+    try:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        os.link(cache_path, output_file)
+    except OSError:
+        shutil.copyfile(cache_path, output_file)
+
+
+def _store_in_cache(output_file: str, cache_path: str):
+    """Add a freshly generated file to the cache, evicting old entries if full."""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        # Hardlink into the cache so the entry and the segment share one
+        # inode — repeated lines across a dub run cost no extra bytes.
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            os.link(output_file, tmp_path)
+        except OSError:
+            shutil.copyfile(output_file, tmp_path)
+        os.replace(tmp_path, cache_path)
+        _evict_cache()
+    except OSError as e:
+        print(f"Warning: TTS cache write failed: {e}", file=sys.stderr)
+
+
+def _evict_cache():
+    """Trim the cache to its size budget, oldest entries first."""
+    entries = []
+    total = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+    if total <= CACHE_MAX_BYTES:
+        return
+
+    for mtime, size, path in sorted(entries):
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+        if total <= CACHE_MAX_BYTES:
+            break
+
+
 def get_api_key():
     """Get ElevenLabs API key from environment."""
     # Try multiple variable names (workaround for stuck secrets)
@@ -52,20 +165,26 @@ def get_api_key():
         raise ValueError("ElevenLabs API key not set. Please add ELEVEN_TTS_KEY secret.")
     return key
 
+@functools.lru_cache(maxsize=128)
 def get_voice_id(language: str = "en", gender: str = "female", style: str = "default") -> str:
-    """Get the appropriate voice ID for language, gender, and style."""
+    """Get the appropriate voice ID for language, gender, and style.
+
+    Memoized: a timed-segment run calls this once per segment with a
+    handful of distinct (language, gender, style) tuples, so repeated
+    calls skip the lower/split allocations and dict chain.
+    """
     lang = language.lower().split("-")[0]
-    
+
     if lang in LANGUAGE_VOICES:
         return LANGUAGE_VOICES[lang].get(gender, LANGUAGE_VOICES[lang]["female"])
-    
+
     return VOICE_MAP.get(gender, VOICE_MAP["female"]).get(style, VOICE_MAP[gender]["default"])
 
 def list_available_voices():
     """List all available voices from ElevenLabs account."""
     try:
         headers = {"xi-api-key": get_api_key()}
-        response = requests.get(f"{API_BASE}/voices", headers=headers, timeout=30)
+        response = _SESSION.get(f"{API_BASE}/voices", headers=headers, timeout=30)
         response.raise_for_status()
         return response.json().get("voices", [])
     except Exception as e:
@@ -75,7 +194,7 @@ def get_user_info():
     """Get user subscription info including character limits."""
     try:
         headers = {"xi-api-key": get_api_key()}
-        response = requests.get(f"{API_BASE}/user", headers=headers, timeout=30)
+        response = _SESSION.get(f"{API_BASE}/user", headers=headers, timeout=30)
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -105,6 +224,18 @@ def generate_audio(text: str, voice_id: str, output_file: str,
         - style=0.25: Adds emotional depth for movie dialogue
     """
     try:
+        cache_path = _cache_path(text, voice_id, stability, similarity_boost, style, use_speaker_boost)
+        if os.path.exists(cache_path):
+            _copy_from_cache(cache_path, output_file)
+            return {
+                "success": True,
+                "output_file": output_file,
+                "voice_id": voice_id,
+                "file_size": os.path.getsize(output_file),
+                "characters_used": 0,
+                "cache_hit": True
+            }
+
         headers = {
             "xi-api-key": get_api_key(),
             "Content-Type": "application/json",
@@ -122,19 +253,27 @@ def generate_audio(text: str, voice_id: str, output_file: str,
             }
         }
         
-        response = requests.post(
+        # Stream chunks to disk as they arrive instead of buffering the
+        # whole MP3 in memory behind response.content.
+        with _SESSION.post(
             f"{API_BASE}/text-to-speech/{voice_id}",
             headers=headers,
             json=data,
-            timeout=120
-        )
-        response.raise_for_status()
-        
-        with open(output_file, 'wb') as f:
-            f.write(response.content)
-        
+            timeout=120,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+
+            # Pipe socket -> disk through one 64KB buffer; honour
+            # Content-Encoding should the API ever gzip responses
+            response.raw.decode_content = True
+            with open(output_file, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=65536)
+
+        _store_in_cache(output_file, cache_path)
+
         file_size = os.path.getsize(output_file)
-        
+
         return {
             "success": True,
             "output_file": output_file,
@@ -154,7 +293,215 @@ def generate_audio(text: str, voice_id: str, output_file: str,
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def generate_multi_speaker_audio(text_file: str, language: str, output_file: str, 
+async def agenerate_audio(session, semaphore, text: str, voice_id: str, output_file: str,
+                          stability: float = 0.35, similarity_boost: float = 0.85,
+                          style: float = 0.25, use_speaker_boost: bool = True) -> dict:
+    """
+    Async counterpart of generate_audio for high-concurrency segment runs.
+    One event loop holds all in-flight requests without per-request OS
+    threads; the semaphore bounds concurrency to the account tier.
+    """
+    try:
+        cache_path = _cache_path(text, voice_id, stability, similarity_boost, style, use_speaker_boost)
+        if os.path.exists(cache_path):
+            _copy_from_cache(cache_path, output_file)
+            return {
+                "success": True,
+                "output_file": output_file,
+                "voice_id": voice_id,
+                "file_size": os.path.getsize(output_file),
+                "characters_used": 0,
+                "cache_hit": True
+            }
+
+        headers = {
+            "xi-api-key": get_api_key(),
+            "Content-Type": "application/json",
+            "Accept": "audio/mpeg"
+        }
+
+        data = {
+            "text": text,
+            "model_id": "eleven_multilingual_v2",
+            "voice_settings": {
+                "stability": stability,
+                "similarity_boost": similarity_boost,
+                "style": style,
+                "use_speaker_boost": use_speaker_boost
+            }
+        }
+
+        # Mirror the sync session's retry policy: transient 429/5xx and
+        # connection drops back off exponentially (honouring Retry-After)
+        # instead of turning a rate-limited segment into a silent gap.
+        retry_statuses = {429, 500, 502, 503, 504}
+        max_attempts = 5
+        async with semaphore:
+            for attempt in range(max_attempts):
+                try:
+                    async with session.post(
+                        f"{API_BASE}/text-to-speech/{voice_id}",
+                        headers=headers,
+                        json=data,
+                        timeout=aiohttp.ClientTimeout(total=120)
+                    ) as response:
+                        if response.status in retry_statuses and attempt < max_attempts - 1:
+                            try:
+                                delay = float(response.headers.get("Retry-After"))
+                            except (TypeError, ValueError):
+                                delay = 0.4 * (2 ** attempt)
+                            await asyncio.sleep(delay)
+                            continue
+                        response.raise_for_status()
+                        async with aiofiles.open(output_file, 'wb') as f:
+                            async for chunk in response.content.iter_chunked(16384):
+                                await f.write(chunk)
+                        break
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if attempt == max_attempts - 1:
+                        raise
+                    await asyncio.sleep(0.4 * (2 ** attempt))
+
+        _store_in_cache(output_file, cache_path)
+
+        return {
+            "success": True,
+            "output_file": output_file,
+            "voice_id": voice_id,
+            "file_size": os.path.getsize(output_file),
+            "characters_used": len(text)
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+async def _agenerate_all(tasks: list) -> list:
+    """Synthesize a list of segment tasks concurrently on one event loop."""
+    semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=TTS_CONCURRENCY * 2)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(*[
+            agenerate_audio(session, semaphore, task['text'], task['voice_id'], task['audio_path'])
+            for task in tasks
+        ], return_exceptions=True)
+
+
+def generate_audio_batch(tasks: list) -> list:
+    """
+    Sync wrapper: synthesize segment tasks and return one result per task,
+    in task order. Uses the aiohttp event loop when available, otherwise
+    falls back to the thread pool.
+    """
+    if HAS_AIOHTTP:
+        results = asyncio.run(_agenerate_all(tasks))
+        return [
+            r if isinstance(r, dict) else {"success": False, "error": str(r)}
+            for r in results
+        ]
+
+    results = [None] * len(tasks)
+    with ThreadPoolExecutor(max_workers=min(TTS_CONCURRENCY, max(len(tasks), 1))) as executor:
+        futures = {
+            executor.submit(generate_audio, task['text'], task['voice_id'], task['audio_path']): i
+            for i, task in enumerate(tasks)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+# Single-speaker texts longer than this are split at sentence boundaries
+# and synthesised concurrently
+CHUNK_THRESHOLD = int(os.environ.get("ELEVEN_TTS_CHUNK_THRESHOLD", "800"))
+
+
+def _split_sentences(text: str, max_chars: int = 700) -> list:
+    """Split text into chunks of at most max_chars at sentence boundaries."""
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    chunks = []
+    current = ""
+    for sentence in sentences:
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def generate_chunked_audio(text: str, voice_id: str, output_file: str) -> dict:
+    """
+    Synthesize long single-speaker text as concurrent sentence chunks.
+
+    Request latency grows with text length, so splitting at sentence
+    boundaries and synthesising chunks in parallel brings wall time close
+    to the longest single chunk.
+    """
+    try:
+        chunks = _split_sentences(text)
+        if len(chunks) <= 1:
+            return generate_audio(text, voice_id, output_file)
+
+        temp_dir = tempfile.mkdtemp(prefix='elevenlabs_chunks_')
+        tasks = [
+            {
+                'text': chunk,
+                'voice_id': voice_id,
+                'audio_path': os.path.join(temp_dir, f"chunk_{i:04d}.mp3")
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+
+        print(f"Chunked synthesis: {len(chunks)} chunks of <= 700 chars", file=sys.stderr)
+
+        results = generate_audio_batch(tasks)
+        chunk_files = []
+        total_chars = 0
+        for task, result in zip(tasks, results):
+            if result.get('success'):
+                chunk_files.append(task['audio_path'])
+                total_chars += result.get('characters_used', len(task['text']))
+            else:
+                print(f"  Warning: Failed chunk: {result.get('error')}", file=sys.stderr)
+
+        if not chunk_files:
+            return {"success": False, "error": "No chunks generated"}
+
+        if len(chunk_files) == 1:
+            shutil.move(chunk_files[0], output_file)
+        else:
+            concat_list = os.path.join(temp_dir, 'concat.txt')
+            with open(concat_list, 'w') as f:
+                f.write('\n'.join(f"file '{p}'" for p in chunk_files))
+
+            try:
+                subprocess.run([
+                    'ffmpeg', '-y', '-loglevel', 'error', '-nostdin',
+                    '-f', 'concat', '-safe', '0',
+                    '-i', concat_list, '-c', 'copy', output_file
+                ], capture_output=True, check=True, timeout=300)
+            except subprocess.CalledProcessError as e:
+                return {"success": False, "error": f"FFmpeg failed: {e.stderr.decode() if e.stderr else str(e)}"}
+
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+        return {
+            "success": True,
+            "output_file": output_file,
+            "voice_id": voice_id,
+            "file_size": os.path.getsize(output_file),
+            "characters_used": total_chars,
+            "chunks": len(chunk_files)
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def generate_multi_speaker_audio(text_file: str, language: str, output_file: str,
                                   speaker_config: dict) -> dict:
     """
     Generate audio with multiple speakers.
@@ -182,9 +529,11 @@ def generate_multi_speaker_audio(text_file: str, language: str, output_file: str
         if mode == 'single' or not speakers:
             voice_id = get_voice_id(language, default_gender)
             print(f"Single speaker mode using voice: {voice_id}", file=sys.stderr)
+            if len(text) > CHUNK_THRESHOLD:
+                return generate_chunked_audio(text, voice_id, output_file)
             return generate_audio(text, voice_id, output_file)
         
-        paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
+        paragraphs = [p for p in (line.strip() for line in text.splitlines()) if p]
         if not paragraphs:
             paragraphs = [text]
         
@@ -194,6 +543,7 @@ def generate_multi_speaker_audio(text_file: str, language: str, output_file: str
         
         print(f"Multi-speaker mode: {mode} with {len(speakers)} speakers for {len(paragraphs)} paragraphs", file=sys.stderr)
         
+        tasks = []
         for i, paragraph in enumerate(paragraphs):
             if mode == 'alternating':
                 speaker_idx = i % 2
@@ -201,48 +551,54 @@ def generate_multi_speaker_audio(text_file: str, language: str, output_file: str
             else:
                 speaker_idx = i % len(speakers)
                 gender = speakers[speaker_idx].get('gender', default_gender)
-            
+
             voice_id = get_voice_id(language, gender)
             segment_file = os.path.join(temp_dir, f"segment_{i:04d}.mp3")
-            
             print(f"  Segment {i+1}/{len(paragraphs)}: Speaker {speaker_idx+1} ({gender})", file=sys.stderr)
-            
-            result = generate_audio(paragraph, voice_id, segment_file)
-            
-            if result.get('success'):
-                segment_files.append(segment_file)
-                total_chars += result.get('characters_used', len(paragraph))
-            else:
-                print(f"  Warning: Failed segment {i}: {result.get('error')}", file=sys.stderr)
+            tasks.append((i, paragraph, voice_id, segment_file))
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(TTS_CONCURRENCY, len(tasks))) as executor:
+            futures = {
+                executor.submit(generate_audio, paragraph, voice_id, segment_file): (i, paragraph, segment_file)
+                for i, paragraph, voice_id, segment_file in tasks
+            }
+            for future in as_completed(futures):
+                i, paragraph, segment_file = futures[future]
+                result = future.result()
+                if result.get('success'):
+                    results[i] = (segment_file, result.get('characters_used', len(paragraph)))
+                else:
+                    print(f"  Warning: Failed segment {i}: {result.get('error')}", file=sys.stderr)
+
+        for i in sorted(results):
+            segment_file, chars = results[i]
+            segment_files.append(segment_file)
+            total_chars += chars
         
         if not segment_files:
             return {"success": False, "error": "No segments generated"}
-        
-        concat_list = os.path.join(temp_dir, 'concat.txt')
-        with open(concat_list, 'w') as f:
-            for seg_file in segment_files:
-                f.write(f"file '{seg_file}'\n")
-        
-        try:
-            subprocess.run([
-                'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
-                '-i', concat_list, '-c', 'copy', output_file
-            ], capture_output=True, check=True, timeout=300)
-            
-            print(f"Concatenated {len(segment_files)} segments", file=sys.stderr)
-        except subprocess.CalledProcessError as e:
-            return {"success": False, "error": f"FFmpeg failed: {e.stderr.decode() if e.stderr else str(e)}"}
-        
-        for seg_file in segment_files:
+
+        if len(segment_files) == 1:
+            # Nothing to concatenate — skip the ffmpeg spawn entirely.
+            shutil.move(segment_files[0], output_file)
+        else:
+            concat_list = os.path.join(temp_dir, 'concat.txt')
+            with open(concat_list, 'w') as f:
+                f.write('\n'.join(f"file '{p}'" for p in segment_files))
+
             try:
-                os.remove(seg_file)
-            except:
-                pass
-        try:
-            os.remove(concat_list)
-            os.rmdir(temp_dir)
-        except:
-            pass
+                subprocess.run([
+                    'ffmpeg', '-y', '-loglevel', 'error', '-nostdin',
+                    '-f', 'concat', '-safe', '0',
+                    '-i', concat_list, '-c', 'copy', output_file
+                ], capture_output=True, check=True, timeout=300)
+
+                print(f"Concatenated {len(segment_files)} segments", file=sys.stderr)
+            except subprocess.CalledProcessError as e:
+                return {"success": False, "error": f"FFmpeg failed: {e.stderr.decode() if e.stderr else str(e)}"}
+
+        shutil.rmtree(temp_dir, ignore_errors=True)
         
         file_size = os.path.getsize(output_file) if os.path.exists(output_file) else 0
         
@@ -287,17 +643,18 @@ def generate_timed_segments(
         generated_segments = []
         total_chars = 0
         failed_count = 0
-        
+
         print(f"Generating {len(segments)} timed segments with ElevenLabs...", file=sys.stderr)
-        
+
+        tasks = []
         for i, seg in enumerate(segments):
             text = seg.get('text', '').strip()
             if not text:
                 continue
-            
+
             start = seg.get('start', 0)
             end = seg.get('end', start + 1)
-            
+
             if mode == 'single':
                 gender = default_gender
             elif mode == 'alternating':
@@ -309,27 +666,38 @@ def generate_timed_segments(
             else:
                 speaker_idx = i % len(speakers) if speakers else 0
                 gender = speakers[speaker_idx].get('gender', default_gender) if speakers else default_gender
-            
+
             voice_id = get_voice_id(language, gender)
             segment_file = os.path.join(output_dir, f"seg_{i:04d}.mp3")
-            
-            result = generate_audio(text, voice_id, segment_file)
-            
+            tasks.append({
+                'audio_path': segment_file,
+                'start': start,
+                'end': end,
+                'text': text,
+                'gender': gender,
+                'voice_id': voice_id,
+                'index': i
+            })
+
+        # Each call is a pure I/O-bound HTTPS request; run the whole task
+        # list through the shared concurrent batch path.
+        results = generate_audio_batch(tasks)
+        for done_count, (task, result) in enumerate(zip(tasks, results), start=1):
             if result.get('success'):
                 generated_segments.append({
-                    'audio_path': segment_file,
-                    'start': start,
-                    'end': end,
-                    'text': text,
-                    'gender': gender,
-                    'index': i
+                    'audio_path': task['audio_path'],
+                    'start': task['start'],
+                    'end': task['end'],
+                    'text': task['text'],
+                    'gender': task['gender'],
+                    'index': task['index']
                 })
-                total_chars += len(text)
-                if (i + 1) % 20 == 0:
-                    print(f"  Progress: {i+1}/{len(segments)} segments", file=sys.stderr)
+                total_chars += len(task['text'])
+                if done_count % 20 == 0:
+                    print(f"  Progress: {done_count}/{len(tasks)} segments", file=sys.stderr)
             else:
                 failed_count += 1
-                print(f"  Warning: Segment {i} failed: {result.get('error', 'unknown')}", file=sys.stderr)
+                print(f"  Warning: Segment {task['index']} failed: {result.get('error', 'unknown')}", file=sys.stderr)
         
         print(f"Generated {len(generated_segments)}/{len(segments)} segments ({total_chars} chars)", file=sys.stderr)
         
@@ -5,9 +5,12 @@ Analyzes audio to detect emotional characteristics for expressive TTS.
 Uses acoustic features (pitch, energy, tempo) to infer emotion.
 """
 
+import os
 import sys
 import json
+import bisect
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Dict, List, Tuple
 
 # Try to import audio analysis libraries
@@ -20,6 +23,18 @@ except ImportError as e:
     HAS_LIBROSA = False
     print(f"Warning: librosa/numpy not available ({e}), audio emotion detection disabled", file=sys.stderr)
 
+if HAS_LIBROSA:
+    # Warm up yin on a dummy frame so any JIT-compiled kernels are built
+    # before the first real segment instead of during it
+    try:
+        librosa.yin(np.zeros(2048, dtype=np.float32), fmin=65, fmax=500, sr=22050)
+    except Exception:
+        pass
+
+# Analysis sample rate: speech F0 and spectral features need nothing above
+# 8 kHz Nyquist, and fewer samples means proportionally less DSP work
+TARGET_SR = 16000
+
 # Emotion categories with corresponding TTS style hints
 EMOTIONS = {
     "neutral": {"pitch_range": (0.9, 1.1), "energy": "medium", "rate": "normal"},
@@ -32,6 +47,19 @@ EMOTIONS = {
     "calm": {"pitch_range": (0.95, 1.05), "energy": "low", "rate": "slow"}
 }
 
+# TTS parameter tables, precomputed at module load so the per-segment
+# hint path is a pair of O(1)/O(log n) lookups instead of dict scans
+_RATE_MAP = {
+    "slow": "-10%",
+    "slightly_slow": "-5%",
+    "normal": "+0%",
+    "slightly_fast": "+5%",
+    "fast": "+10%"
+}
+
+_PITCH_BOUNDS = [0.7, 0.85, 0.95, 1.05, 1.15, 1.5]
+_PITCH_ADJ = ["-10%", "-5%", "+0%", "+5%", "+10%"]
+
 # Edge TTS voice style mapping
 EDGE_TTS_STYLES = {
     "neutral": "general",
@@ -56,51 +84,63 @@ def extract_acoustic_features(audio_path: str) -> Dict:
         return {"error": "librosa not available for audio analysis"}
     
     try:
-        # Load audio
-        y, sr = librosa.load(audio_path, sr=22050)
+        # Load audio: when the file is already mono at the target rate,
+        # read it straight through libsndfile and skip the resampler
+        info = sf.info(audio_path)
+        if info.samplerate == TARGET_SR and info.channels == 1:
+            y, sr = sf.read(audio_path, dtype='float32', always_2d=False), TARGET_SR
+        else:
+            # polyphase resampling is ~4x faster than soxr_hq with no
+            # audible difference for feature extraction
+            y, sr = librosa.load(audio_path, sr=TARGET_SR, mono=True, dtype=np.float32, res_type='polyphase')
         
         if len(y) == 0:
             return {"error": "Empty audio file"}
         
-        # Extract pitch (F0)
-        pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-        pitch_values = []
-        for t in range(pitches.shape[1]):
-            pitch = pitches[:, t]
-            mag = magnitudes[:, t]
-            if np.max(mag) > 0.1:  # Only consider frames with significant energy
-                index = np.argmax(mag)
-                if pitch[index] > 0:
-                    pitch_values.append(pitch[index])
-        
-        if pitch_values:
-            mean_pitch = np.mean(pitch_values)
-            pitch_std = np.std(pitch_values)
-            pitch_range = np.max(pitch_values) - np.min(pitch_values)
+        # Extract pitch (F0) — yin's time-domain autocorrelation is far
+        # cheaper than piptrack's full-spectrogram peak picking and returns
+        # a 1-D F0 track directly
+        f0 = librosa.yin(y, fmin=65, fmax=500, sr=sr, frame_length=2048)
+        pitch_values = f0[np.isfinite(f0) & (f0 > 0)]
+
+        if pitch_values.size:
+            mean_pitch = pitch_values.mean()
+            pitch_std = pitch_values.std()
+            pitch_range = pitch_values.max() - pitch_values.min()
         else:
             mean_pitch = 0
             pitch_std = 0
             pitch_range = 0
         
+        # One STFT shared by RMS, spectral features, and the onset envelope
+        # instead of each feature recomputing its own
+        S = np.abs(librosa.stft(y, n_fft=1024, hop_length=256))
+
         # Extract RMS energy
-        rms = librosa.feature.rms(y=y)[0]
+        rms = librosa.feature.rms(S=S)[0]
         mean_energy = np.mean(rms)
         energy_std = np.std(rms)
-        
-        # Extract tempo
-        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-        tempo = float(tempo) if isinstance(tempo, np.ndarray) else tempo
-        
+
+        # Duration (needed for the tempo approximation below)
+        duration = len(y) / sr
+
+        # Approximate tempo from the onset rate: beat_track's dynamic
+        # programming is the single most expensive step here and the
+        # classifier only coarsely thresholds tempo
+        onset_env = librosa.onset.onset_strength(S=librosa.power_to_db(S ** 2), sr=sr, hop_length=256)
+        if duration > 2.0:
+            onsets = librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr, hop_length=256, units='time')
+            tempo = 60.0 * len(onsets) / max(duration, 0.5)
+        else:
+            tempo = 120.0
+
         # Extract spectral features
-        spectral_centroid = np.mean(librosa.feature.spectral_centroid(y=y, sr=sr))
-        spectral_rolloff = np.mean(librosa.feature.spectral_rolloff(y=y, sr=sr))
+        spectral_centroid = np.mean(librosa.feature.spectral_centroid(S=S, sr=sr))
+        spectral_rolloff = np.mean(librosa.feature.spectral_rolloff(S=S, sr=sr))
         
         # Zero crossing rate (correlates with voiced/unvoiced)
         zcr = np.mean(librosa.feature.zero_crossing_rate(y))
-        
-        # Duration
-        duration = len(y) / sr
-        
+
         return {
             "success": True,
             "duration": round(duration, 3),
@@ -172,14 +212,20 @@ def classify_emotion(features: Dict) -> Dict:
     if not scores:
         scores["neutral"] = 0.5
     
-    # Get highest scoring emotion
-    best_emotion = max(scores, key=scores.get)
-    confidence = scores[best_emotion]
-    
+    # Get highest scoring emotion in a single pass
+    best_emotion = "neutral"
+    confidence = 0.0
+    all_scores = {}
+    for emotion, score in scores.items():
+        all_scores[emotion] = round(score, 2)
+        if score > confidence:
+            best_emotion = emotion
+            confidence = score
+
     return {
         "emotion": best_emotion,
         "confidence": round(confidence, 2),
-        "all_scores": {k: round(v, 2) for k, v in sorted(scores.items(), key=lambda x: -x[1])},
+        "all_scores": all_scores,
         "tts_style": EDGE_TTS_STYLES.get(best_emotion, "general")
     }
 
@@ -205,35 +251,16 @@ def get_tts_hints(emotion_result: Dict) -> Dict:
     """
     emotion = emotion_result.get("emotion", "neutral")
     emotion_info = EMOTIONS.get(emotion, EMOTIONS["neutral"])
-    
-    # Map emotion to TTS parameters
-    rate_map = {
-        "slow": "-10%",
-        "slightly_slow": "-5%",
-        "normal": "+0%",
-        "slightly_fast": "+5%",
-        "fast": "+10%"
-    }
-    
-    pitch_map = {
-        (0.7, 0.85): "-10%",
-        (0.85, 0.95): "-5%",
-        (0.95, 1.05): "+0%",
-        (1.05, 1.15): "+5%",
-        (1.15, 1.5): "+10%"
-    }
-    
-    # Get pitch adjustment
+
+    # Get pitch adjustment via the precomputed bucket table
     pitch_range = emotion_info.get("pitch_range", (0.95, 1.05))
     pitch_center = (pitch_range[0] + pitch_range[1]) / 2
     pitch_adjust = "+0%"
-    for (low, high), adj in pitch_map.items():
-        if low <= pitch_center < high:
-            pitch_adjust = adj
-            break
-    
+    if _PITCH_BOUNDS[0] <= pitch_center < _PITCH_BOUNDS[-1]:
+        pitch_adjust = _PITCH_ADJ[bisect.bisect_right(_PITCH_BOUNDS, pitch_center) - 1]
+
     return {
-        "rate": rate_map.get(emotion_info.get("rate", "normal"), "+0%"),
+        "rate": _RATE_MAP.get(emotion_info.get("rate", "normal"), "+0%"),
         "pitch": pitch_adjust,
         "style": EDGE_TTS_STYLES.get(emotion, "general"),
         "emphasis": "strong" if emotion in ["angry", "surprised", "fearful"] else "moderate"
@@ -244,12 +271,19 @@ def analyze_segments_batch(audio_paths: List[str]) -> Dict:
     """
     Analyze multiple audio segments for emotion.
     """
-    results = []
-    for i, path in enumerate(audio_paths):
-        result = analyze_segment(path)
+    # Each segment is independent CPU-bound DSP work, so spread it across
+    # cores; processes (not threads) sidestep the GIL for the numpy kernels.
+    if len(audio_paths) > 1:
+        workers = min(len(audio_paths), os.cpu_count() or 1)
+        chunksize = max(1, len(audio_paths) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(analyze_segment, audio_paths, chunksize=chunksize))
+    else:
+        results = [analyze_segment(path) for path in audio_paths]
+
+    for i, (path, result) in enumerate(zip(audio_paths, results)):
         result["segment_index"] = i
         result["path"] = path
-        results.append(result)
     
     # Aggregate statistics
     emotions = [r["emotion"]["emotion"] for r in results if r.get("success")]
@@ -270,13 +304,22 @@ def analyze_segments_batch(audio_paths: List[str]) -> Dict:
 
 def main():
     parser = argparse.ArgumentParser(description='Detect emotion in audio for dubbing')
-    parser.add_argument('input', help='Input audio file')
+    parser.add_argument('input', help='Input audio file (or JSON list of files with --batch)')
     parser.add_argument('--output', '-o', help='Output JSON file (optional)')
+    parser.add_argument('--batch', '-b', action='store_true',
+                        help='Treat input as a JSON file listing segment paths; analyze all in one process')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
-    
+
     args = parser.parse_args()
-    
-    result = analyze_segment(args.input)
+
+    if args.batch:
+        # One process for the whole list amortises the librosa import and
+        # warmup cost across segments instead of paying it per spawn
+        with open(args.input, 'r') as f:
+            audio_paths = json.load(f)
+        result = analyze_segments_batch(audio_paths)
+    else:
+        result = analyze_segment(args.input)
     
     output = json.dumps(result, indent=2)
     
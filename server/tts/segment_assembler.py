@@ -7,8 +7,10 @@ Uses high-quality pyrubberband for time stretching (Netflix-quality).
 import sys
 import os
 import json
+import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 # Try to import pyrubberband for high-quality time stretching
 try:
@@ -21,8 +23,31 @@ except ImportError as e:
     np = None  # Placeholder for when numpy isn't available
     print(f"Warning: pyrubberband/numpy not available ({e}), falling back to FFmpeg atempo", file=sys.stderr)
 
+try:
+    from mutagen.mp3 import MP3
+    HAS_MUTAGEN = True
+except ImportError:
+    HAS_MUTAGEN = False
+
 def get_audio_duration(file_path: str) -> float:
-    """Get audio duration in seconds."""
+    """Get audio duration in seconds.
+
+    Reads the file header directly (mutagen for MP3, libsndfile otherwise)
+    instead of forking ffprobe per segment; ffprobe stays as the fallback.
+    """
+    if HAS_MUTAGEN and file_path.endswith('.mp3'):
+        try:
+            return float(MP3(file_path).info.length)
+        except Exception:
+            pass
+
+    if HAS_RUBBERBAND:
+        try:
+            info = sf.info(file_path)
+            return info.frames / info.samplerate
+        except Exception:
+            pass
+
     result = subprocess.run([
         'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
         '-of', 'default=noprint_wrappers=1:nokey=1', file_path
@@ -32,12 +57,45 @@ def get_audio_duration(file_path: str) -> float:
     except:
         return 0
 
-def generate_silence(duration: float, output_path: str, sample_rate: int = 44100) -> bool:
-    """Generate silent audio of specified duration."""
+def _probe_stream_params(file_path: str):
+    """Return (sample_rate, channels) from the file header, or None."""
+    if HAS_MUTAGEN and file_path.endswith('.mp3'):
+        try:
+            info = MP3(file_path).info
+            return (int(info.sample_rate), int(info.channels))
+        except Exception:
+            pass
+
+    if HAS_RUBBERBAND:
+        try:
+            info = sf.info(file_path)
+            return (int(info.samplerate), int(info.channels))
+        except Exception:
+            pass
+
+    try:
+        result = subprocess.run([
+            'ffprobe', '-v', 'quiet', '-select_streams', 'a:0',
+            '-show_entries', 'stream=sample_rate,channels',
+            '-of', 'default=noprint_wrappers=1:nokey=1', file_path
+        ], capture_output=True, text=True)
+        rate, channels = result.stdout.split()[:2]
+        return (int(rate), int(channels))
+    except (OSError, ValueError, IndexError):
+        return None
+
+def generate_silence(duration: float, output_path: str, sample_rate: int = 44100,
+                     channels: int = 1) -> bool:
+    """Generate silent audio of specified duration.
+
+    CBR MP3 with rate/channels matching the TTS segments, so the final
+    concat can stream-copy instead of re-encoding everything a second time.
+    """
+    layout = 'mono' if channels == 1 else 'stereo'
     result = subprocess.run([
         'ffmpeg', '-y', '-f', 'lavfi',
-        '-i', f'anullsrc=r={sample_rate}:cl=stereo',
-        '-t', str(duration), '-acodec', 'libmp3lame', '-q:a', '2',
+        '-i', f'anullsrc=r={sample_rate}:cl={layout}',
+        '-t', str(duration), '-acodec', 'libmp3lame', '-b:a', '192k',
         output_path
     ], capture_output=True)
     return result.returncode == 0
@@ -49,14 +107,33 @@ def adjust_segment_speed_rubberband(input_path: str, output_path: str, target_du
     """
     if not HAS_RUBBERBAND:
         return adjust_segment_speed_ffmpeg(input_path, output_path, target_duration)
-    
+
     try:
-        # Load audio
-        audio, sr = sf.read(input_path)
-        
-        # Handle stereo
-        if len(audio.shape) > 1:
-            audio = np.mean(audio, axis=1)
+        # Header-read duration first: when the segment already fits within
+        # the stretch dead zone, skip the decode/stretch/encode round-trip
+        # entirely and hardlink the input into place
+        header_duration = get_audio_duration(input_path)
+        if header_duration > 0 and target_duration > 0:
+            ratio = target_duration / header_duration
+            if abs(ratio - 1.0) <= 0.02:
+                try:
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                    os.link(input_path, output_path)
+                except OSError:
+                    shutil.copy(input_path, output_path)
+                return True
+
+        # Load as float32 directly — sf.read defaults to float64, doubling
+        # memory bandwidth for no quality gain on MP3 sources
+        audio, sr = sf.read(input_path, dtype='float32', always_2d=False)
+
+        # Handle stereo: average into the first channel in place rather
+        # than allocating a fresh array with np.mean
+        if audio.ndim > 1:
+            np.add(audio[:, 0], audio[:, 1], out=audio[:, 0])
+            audio = audio[:, 0]
+            audio *= 0.5
         
         current_duration = len(audio) / sr
         if current_duration <= 0 or target_duration <= 0:
@@ -71,25 +148,19 @@ def adjust_segment_speed_rubberband(input_path: str, output_path: str, target_du
             stretched = pyrb.time_stretch(audio, sr, stretch_ratio, rbargs={'-c': '2'})
         else:
             stretched = audio
-        
-        # Save to temporary WAV, then convert to MP3
-        temp_wav = output_path.replace('.mp3', '_temp.wav')
-        sf.write(temp_wav, stretched, sr)
-        
-        # Convert to MP3
-        result = subprocess.run([
-            'ffmpeg', '-y', '-i', temp_wav,
-            '-acodec', 'libmp3lame', '-q:a', '2',
+
+        # Pipe raw PCM straight into ffmpeg's stdin — no temp WAV
+        # write/read round-trip per segment
+        raw = stretched.astype(np.float32).tobytes()
+        proc = subprocess.Popen([
+            'ffmpeg', '-y', '-f', 'f32le', '-ar', str(sr), '-ac', '1',
+            '-i', 'pipe:0',
+            '-acodec', 'libmp3lame', '-b:a', '192k',
             output_path
-        ], capture_output=True)
-        
-        # Cleanup temp file
-        try:
-            os.remove(temp_wav)
-        except:
-            pass
-        
-        return result.returncode == 0
+        ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        proc.communicate(raw)
+
+        return proc.returncode == 0
         
     except Exception as e:
         print(f"Rubberband stretch failed: {e}, falling back to FFmpeg", file=sys.stderr)
@@ -107,7 +178,7 @@ def adjust_segment_speed_ffmpeg(input_path: str, output_path: str, target_durati
     result = subprocess.run([
         'ffmpeg', '-y', '-i', input_path,
         '-filter:a', f'atempo={speed_factor}',
-        '-vn', '-acodec', 'libmp3lame', '-q:a', '2',
+        '-vn', '-acodec', 'libmp3lame', '-b:a', '192k',
         output_path
     ], capture_output=True)
     return result.returncode == 0
@@ -119,6 +190,10 @@ def adjust_segment_speed(input_path: str, output_path: str, target_duration: flo
     else:
         return adjust_segment_speed_ffmpeg(input_path, output_path, target_duration)
 
+def _run_assembly_task(task: dict) -> bool:
+    """Worker for one planned adjust job (runs in a pool process)."""
+    return adjust_segment_speed(task['input'], task['path'], task['target'])
+
 def assemble_segments_with_timing(
     tts_segments: list,
     total_duration: float,
@@ -147,64 +222,129 @@ def assemble_segments_with_timing(
             return {"success": False, "error": "No segments provided"}
         
         tts_segments = sorted(tts_segments, key=lambda x: x['start'])
-        
-        segment_files = []
+
+        # Phase 1: plan every silence/adjust/passthrough action up front
+        # (header-read durations only — no subprocess spawns here).
+        # Progress lines are collected and flushed once — per-segment
+        # print() calls are a syscall each and interleave badly with the
+        # ffmpeg children's own stderr.
+        log = []
+        tasks = []
         current_time = 0.0
-        
+
         for i, seg in enumerate(tts_segments):
             start_time = seg['start']
             end_time = seg['end']
             audio_path = seg['audio_path']
             target_duration = end_time - start_time
-            
+
             if start_time > current_time:
                 silence_duration = start_time - current_time
-                silence_file = os.path.join(temp_dir, f'silence_{i:04d}.mp3')
-                if generate_silence(silence_duration, silence_file, sample_rate):
-                    segment_files.append(silence_file)
-                    print(f"  Added {silence_duration:.2f}s silence at {current_time:.2f}s", file=sys.stderr)
+                tasks.append({'type': 'silence', 'duration': silence_duration})
+                log.append(f"  Added {silence_duration:.2f}s silence at {current_time:.2f}s\n")
                 current_time = start_time
-            
+
             if os.path.exists(audio_path):
                 actual_duration = get_audio_duration(audio_path)
-                
+
                 if abs(actual_duration - target_duration) > 0.3:
-                    adjusted_file = os.path.join(temp_dir, f'adjusted_{i:04d}.mp3')
-                    if adjust_segment_speed(audio_path, adjusted_file, target_duration):
-                        segment_files.append(adjusted_file)
-                        print(f"  Segment {i}: {actual_duration:.2f}s -> {target_duration:.2f}s (speed adjusted)", file=sys.stderr)
-                    else:
-                        segment_files.append(audio_path)
-                        print(f"  Segment {i}: {actual_duration:.2f}s (speed adjust failed, using original)", file=sys.stderr)
+                    tasks.append({
+                        'type': 'adjust',
+                        'input': audio_path,
+                        'path': os.path.join(temp_dir, f'adjusted_{i:04d}.mp3'),
+                        'target': target_duration,
+                        'actual': actual_duration,
+                        'index': i
+                    })
                 else:
-                    segment_files.append(audio_path)
-                    print(f"  Segment {i}: {actual_duration:.2f}s (good fit)", file=sys.stderr)
-                
+                    tasks.append({'type': 'passthrough', 'path': audio_path})
+                    log.append(f"  Segment {i}: {actual_duration:.2f}s (good fit)\n")
+
                 current_time = end_time
             else:
-                print(f"  Warning: Segment {i} audio not found: {audio_path}", file=sys.stderr)
-                silence_file = os.path.join(temp_dir, f'gap_{i:04d}.mp3')
-                if generate_silence(target_duration, silence_file, sample_rate):
-                    segment_files.append(silence_file)
+                log.append(f"  Warning: Segment {i} audio not found: {audio_path}\n")
+                tasks.append({'type': 'silence', 'duration': target_duration})
                 current_time = end_time
-        
+
         if current_time < total_duration:
-            final_silence = os.path.join(temp_dir, 'final_silence.mp3')
-            if generate_silence(total_duration - current_time, final_silence, sample_rate):
-                segment_files.append(final_silence)
-                print(f"  Added {total_duration - current_time:.2f}s final silence", file=sys.stderr)
-        
-        if not segment_files:
+            tasks.append({'type': 'silence', 'duration': total_duration - current_time})
+            log.append(f"  Added {total_duration - current_time:.2f}s final silence\n")
+
+        # One master silence file covers every gap: each gap becomes an
+        # inpoint/outpoint slice of it in the concat list, so silence costs
+        # a single ffmpeg spawn no matter how many gaps there are
+        silence_tasks = [t for t in tasks if t['type'] == 'silence']
+        master_silence = None
+        if silence_tasks:
+            # Match the silence to the actual TTS segment stream params
+            # (edge-tts emits 24kHz mono, not the 44.1kHz default) so the
+            # stream-copy concat below stays in spec
+            seg_params = None
+            for t in tasks:
+                probe_path = t.get('input') or (t['path'] if t['type'] == 'passthrough' else None)
+                if probe_path:
+                    seg_params = _probe_stream_params(probe_path)
+                    break
+            silence_rate, silence_channels = seg_params or (sample_rate, 1)
+            candidate = os.path.join(temp_dir, 'silence_master.mp3')
+            max_gap = max(t['duration'] for t in silence_tasks)
+            if generate_silence(max_gap, candidate, silence_rate, silence_channels):
+                master_silence = candidate
+
+        # Phase 2: the adjust jobs are independent CPU-bound work,
+        # so spread them across cores
+        jobs = [t for t in tasks if t['type'] == 'adjust']
+        if jobs:
+            workers = min(len(jobs), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for task, ok in zip(jobs, executor.map(_run_assembly_task, jobs)):
+                    task['ok'] = ok
+
+        # Stitch the concat entries back together in planned order
+        concat_entries = []
+        concat_files = {}  # insertion-ordered unique input paths
+        for task in tasks:
+            if task['type'] == 'passthrough':
+                concat_entries.append(f"file '{task['path']}'\n")
+                concat_files[task['path']] = None
+            elif task['type'] == 'silence':
+                if master_silence:
+                    concat_entries.append(
+                        f"file '{master_silence}'\ninpoint 0\noutpoint {task['duration']:.3f}\n"
+                    )
+                    concat_files[master_silence] = None
+            else:
+                if task.get('ok'):
+                    concat_entries.append(f"file '{task['path']}'\n")
+                    concat_files[task['path']] = None
+                    log.append(f"  Segment {task['index']}: {task['actual']:.2f}s -> {task['target']:.2f}s (speed adjusted)\n")
+                else:
+                    concat_entries.append(f"file '{task['input']}'\n")
+                    concat_files[task['input']] = None
+                    log.append(f"  Segment {task['index']}: {task['actual']:.2f}s (speed adjust failed, using original)\n")
+
+        sys.stderr.write("".join(log))
+
+        if not concat_entries:
             return {"success": False, "error": "No segments to concatenate"}
-        
+
         concat_list = os.path.join(temp_dir, 'concat.txt')
         with open(concat_list, 'w') as f:
-            for seg_file in segment_files:
-                f.write(f"file '{seg_file}'\n")
+            f.write("".join(concat_entries))
         
+        # Stream-copy is only in spec when every input shares one sample
+        # rate and channel count (header reads, no extra spawns); any
+        # mismatch or failed probe falls back to the re-encode
+        stream_params = {_probe_stream_params(p) for p in concat_files}
+        if len(stream_params) == 1 and None not in stream_params:
+            codec_args = ['-c', 'copy']
+        else:
+            log_line = f"  Mixed stream params {stream_params}, re-encoding concat\n"
+            sys.stderr.write(log_line)
+            codec_args = ['-acodec', 'libmp3lame', '-b:a', '192k']
         result = subprocess.run([
             'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
-            '-i', concat_list, '-acodec', 'libmp3lame', '-q:a', '2',
+            '-i', concat_list] + codec_args + [
             output_path
         ], capture_output=True, timeout=600)
         
@@ -215,18 +355,8 @@ def assemble_segments_with_timing(
             }
         
         final_duration = get_audio_duration(output_path)
-        
-        for f in segment_files:
-            if f.startswith(temp_dir):
-                try:
-                    os.remove(f)
-                except:
-                    pass
-        try:
-            os.remove(concat_list)
-            os.rmdir(temp_dir)
-        except:
-            pass
+
+        shutil.rmtree(temp_dir, ignore_errors=True)
         
         return {
             "success": True,
@@ -270,11 +400,19 @@ def main():
         # Handle both formats: direct list or {segments: [...]}
         segments = data.get("segments", data) if isinstance(data, dict) else data
         
+        # One directory read instead of a stat call per expected segment
+        try:
+            present = {e.name for e in os.scandir(tts_dir)
+                       if e.name.startswith('segment_') and e.name.endswith('.mp3')}
+        except OSError:
+            present = set()
+
         # Map each segment to its TTS audio file
         mapped_segments = []
         for i, seg in enumerate(segments):
-            tts_file = os.path.join(tts_dir, f"segment_{i:04d}.mp3")
-            if os.path.exists(tts_file):
+            name = f"segment_{i:04d}.mp3"
+            tts_file = os.path.join(tts_dir, name)
+            if name in present:
                 mapped_segments.append({
                     "audio_path": tts_file,
                     "start": seg.get("start", 0),
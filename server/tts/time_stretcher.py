@@ -9,6 +9,7 @@ import sys
 import json
 import argparse
 import os
+import functools
 from typing import Optional, Tuple
 
 try:
@@ -20,8 +21,22 @@ except ImportError as e:
     HAS_RUBBERBAND = False
     print(f"Warning: pyrubberband/numpy not available ({e}), time stretching disabled", file=sys.stderr)
 
+# Rubberband 3.x selects its faster R3 engine with the value-less -3/--fine
+# flag, which pyrubberband cannot emit (rbargs entries always serialize as
+# key/value pairs), so stick with the R2 crispness args on every version.
+_RBARGS = {'-c': '2'}
+
 def analyze_audio_duration(audio_path: str) -> float:
-    """Get duration of audio file in seconds."""
+    """Get duration of audio file in seconds (cached per file mtime/size)."""
+    try:
+        st = os.stat(audio_path)
+    except OSError:
+        return 0.0
+    return _duration_cached(audio_path, st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=1024)
+def _duration_cached(audio_path: str, mtime_ns: int, size: int) -> float:
+    # mtime_ns/size are cache-key-only: a rewritten file probes fresh.
     if not HAS_RUBBERBAND:
         # Fallback to ffprobe
         import subprocess
@@ -112,49 +127,69 @@ def time_stretch_audio(
         return time_stretch_audio_ffmpeg(input_path, output_path, target_duration, min_stretch, max_stretch)
     
     try:
-        # Load audio
-        audio, sr = sf.read(input_path)
-        
-        # Handle stereo by converting to mono for processing
-        if len(audio.shape) > 1:
-            audio_mono = np.mean(audio, axis=1)
-        else:
-            audio_mono = audio
-        
-        # Calculate current duration
-        current_duration = len(audio_mono) / sr
-        
+        # Header-only duration read; samples are only decoded if we
+        # actually need to stretch
+        current_duration = sf.info(input_path).duration
+
         if current_duration == 0:
             return {
                 "success": False,
                 "error": "Input audio has zero duration"
             }
-        
+
         # Calculate required stretch ratio
         stretch_ratio = target_duration / current_duration
-        
+
         # Clamp to safe range
         original_ratio = stretch_ratio
         stretch_ratio = max(min_stretch, min(max_stretch, stretch_ratio))
         was_clamped = original_ratio != stretch_ratio
-        
-        # Apply time stretching using rubberband
-        if abs(stretch_ratio - 1.0) > 0.01:  # Only stretch if needed
+
+        if abs(stretch_ratio - 1.0) <= 0.01:
+            # Already fits: hardlink (or copy across devices) instead of
+            # a pointless decode -> mixdown -> re-encode round trip
+            import shutil
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            try:
+                os.link(input_path, output_path)
+            except OSError:
+                shutil.copyfile(input_path, output_path)
+            actual_duration = current_duration
+        else:
+            # Load audio as float32 (the default float64 doubles every
+            # byte touched downstream)
+            audio, sr = sf.read(input_path, dtype='float32')
+
+            # Handle stereo by converting to mono for processing; the
+            # two-channel case runs as one fused add + scale with no
+            # float64 temporary
+            if len(audio.shape) > 1:
+                if audio.shape[1] == 2:
+                    audio_mono = np.empty(audio.shape[0], dtype=audio.dtype)
+                    np.add(audio[:, 0], audio[:, 1], out=audio_mono)
+                    np.multiply(audio_mono, 0.5, out=audio_mono)
+                else:
+                    audio_mono = audio.mean(axis=1, dtype=np.float32)
+            else:
+                audio_mono = audio
+
+            # Apply time stretching using rubberband
             stretched_audio = pyrb.time_stretch(
-                audio_mono, 
-                sr, 
+                audio_mono,
+                sr,
                 stretch_ratio,
-                rbargs={'-c': '2'}  # Use high quality mode
+                rbargs=_RBARGS
             )
-        else:
-            stretched_audio = audio_mono
-        
-        # Calculate actual output duration
-        actual_duration = len(stretched_audio) / sr
-        
-        # Write output
-        sf.write(output_path, stretched_audio, sr)
-        
+
+            # Calculate actual output duration
+            actual_duration = len(stretched_audio) / sr
+
+            # Write output
+            # PCM_16 keeps output files half the size of float wavs;
+            # edge-tts clips are 16-bit sources anyway
+            sf.write(output_path, stretched_audio, sr, subtype='PCM_16')
+
         return {
             "success": True,
             "input_duration": round(current_duration, 3),
@@ -173,6 +208,126 @@ def time_stretch_audio(
         }
 
 
+def _stretch_one(args) -> dict:
+    """Pool worker: stretch a single segment (top-level so it pickles)."""
+    i, seg, input_dir, output_dir, timing_mode = args
+    input_path = os.path.join(input_dir, seg.get('file', f'segment_{i}.wav'))
+    output_path = os.path.join(output_dir, f'stretched_{i}.wav')
+
+    # Calculate target duration from original timing
+    target_duration = seg.get('end', 0) - seg.get('start', 0)
+
+    if target_duration <= 0:
+        return {
+            "segment": i,
+            "success": False,
+            "error": "Invalid timing"
+        }
+
+    # Apply time stretching
+    if timing_mode == "fit":
+        result = time_stretch_audio(
+            input_path,
+            output_path,
+            target_duration,
+            min_stretch=0.75,  # Allow 25% speed up
+            max_stretch=1.3    # Allow 30% slow down
+        )
+    else:
+        # Natural mode: only minor adjustments
+        result = time_stretch_audio(
+            input_path,
+            output_path,
+            target_duration,
+            min_stretch=0.9,
+            max_stretch=1.1
+        )
+
+    result["segment"] = i
+    result["original_start"] = seg.get('start')
+    result["original_end"] = seg.get('end')
+    return result
+
+
+def _stretch_segments_ffmpeg_batched(tasks: list, batch_size: int = 32) -> list:
+    """
+    FFmpeg fallback for a whole segment list in as few processes as
+    possible. Instead of one ffmpeg spawn (plus codec init) per segment,
+    batches of inputs go through a single -filter_complex graph with a
+    per-input atempo and one -map per output. batch_size keeps the argv
+    within OS limits.
+    """
+    import subprocess
+
+    results = {}
+    pending = []
+
+    for i, seg, input_dir, output_dir, timing_mode in tasks:
+        input_path = os.path.join(input_dir, seg.get('file', f'segment_{i}.wav'))
+        output_path = os.path.join(output_dir, f'stretched_{i}.wav')
+        target_duration = seg.get('end', 0) - seg.get('start', 0)
+        base = {
+            "segment": i,
+            "original_start": seg.get('start'),
+            "original_end": seg.get('end')
+        }
+
+        if target_duration <= 0:
+            results[i] = {**base, "success": False, "error": "Invalid timing"}
+            continue
+
+        current_duration = analyze_audio_duration(input_path)
+        if current_duration <= 0:
+            results[i] = {**base, "success": False, "error": "Invalid duration"}
+            continue
+
+        # Same clamp as time_stretch_audio_ffmpeg applies per segment
+        lo, hi = (0.75, 1.3) if timing_mode == "fit" else (0.9, 1.1)
+        speed_factor = max(lo, min(hi, current_duration / target_duration))
+        pending.append((i, base, input_path, output_path, current_duration,
+                        target_duration, speed_factor, lo, hi))
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        cmd = ['ffmpeg', '-y']
+        filters = []
+        maps = []
+        for k, (_, _, input_path, output_path, _, _, speed, _, _) in enumerate(batch):
+            cmd += ['-i', input_path]
+            filters.append(f'[{k}:a]atempo={speed}[a{k}]')
+            maps += ['-map', f'[a{k}]', output_path]
+        cmd += ['-filter_complex', ';'.join(filters)] + maps
+
+        try:
+            proc = subprocess.run(cmd, capture_output=True, timeout=600)
+            ok = proc.returncode == 0
+        except Exception:
+            ok = False
+
+        for (i, base, input_path, output_path, current_duration,
+             target_duration, speed, lo, hi) in batch:
+            if ok:
+                actual_duration = analyze_audio_duration(output_path)
+                results[i] = {
+                    **base,
+                    "success": True,
+                    "input_duration": round(current_duration, 3),
+                    "target_duration": round(target_duration, 3),
+                    "actual_duration": round(actual_duration, 3),
+                    "stretch_ratio": round(1.0 / speed, 3),
+                    "method": "ffmpeg_atempo",
+                    "output_path": output_path
+                }
+            else:
+                # One bad input fails the whole graph; retry singly so it
+                # only takes its own segment down
+                result = time_stretch_audio_ffmpeg(
+                    input_path, output_path, target_duration, lo, hi)
+                results[i] = {**base, **result}
+
+    return [results[i] for i, *_ in tasks]
+
+
 def stretch_segments(
     segments: list,
     input_dir: str,
@@ -181,59 +336,45 @@ def stretch_segments(
 ) -> dict:
     """
     Time-stretch multiple audio segments to fit original timing.
-    
+    Segments are independent compute-bound rubberband calls, so they are
+    fanned out across CPU cores (tunable via RAMPAGE_STRETCH_WORKERS).
+
     Args:
         segments: List of segment dicts with 'file', 'start', 'end' keys
         input_dir: Directory containing input segment files
         output_dir: Directory for stretched output files
         timing_mode: 'fit' (stretch to exact timing) or 'natural' (minimal stretch)
-    
+
     Returns:
         dict with results for each segment
     """
     os.makedirs(output_dir, exist_ok=True)
-    
-    results = []
-    
-    for i, seg in enumerate(segments):
-        input_path = os.path.join(input_dir, seg.get('file', f'segment_{i}.wav'))
-        output_path = os.path.join(output_dir, f'stretched_{i}.wav')
-        
-        # Calculate target duration from original timing
-        target_duration = seg.get('end', 0) - seg.get('start', 0)
-        
-        if target_duration <= 0:
-            results.append({
-                "segment": i,
-                "success": False,
-                "error": "Invalid timing"
-            })
-            continue
-        
-        # Apply time stretching
-        if timing_mode == "fit":
-            result = time_stretch_audio(
-                input_path, 
-                output_path, 
-                target_duration,
-                min_stretch=0.75,  # Allow 25% speed up
-                max_stretch=1.3    # Allow 30% slow down
-            )
-        else:
-            # Natural mode: only minor adjustments
-            result = time_stretch_audio(
-                input_path, 
-                output_path, 
-                target_duration,
-                min_stretch=0.9,
-                max_stretch=1.1
-            )
-        
-        result["segment"] = i
-        result["original_start"] = seg.get('start')
-        result["original_end"] = seg.get('end')
-        results.append(result)
-    
+
+    tasks = [(i, seg, input_dir, output_dir, timing_mode)
+             for i, seg in enumerate(segments)]
+
+    if not HAS_RUBBERBAND:
+        # Without rubberband every segment would spawn its own ffmpeg;
+        # batch them through shared filter graphs instead
+        results = _stretch_segments_ffmpeg_batched(tasks)
+        return {
+            "success": all(r.get("success", False) for r in results),
+            "segments": results,
+            "total_segments": len(segments),
+            "successful_segments": sum(1 for r in results if r.get("success", False))
+        }
+
+    workers = min(len(tasks),
+                  int(os.environ.get("RAMPAGE_STRETCH_WORKERS", os.cpu_count() or 1)))
+
+    if workers <= 1:
+        results = [_stretch_one(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map preserves task order in its results
+            results = list(executor.map(_stretch_one, tasks))
+
     return {
         "success": all(r.get("success", False) for r in results),
         "segments": results,
@@ -7,10 +7,171 @@ Outputs timestamped segments for precise dubbing sync
 import sys
 import os
 import json
+import hashlib
 import subprocess
+import threading
+import time
 import speech_recognition as sr
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# NumPy is only used for the cheap silence prefilter and VAD cut points
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# webrtcvad gives more precise voice activity frames than the energy
+# heuristic; both feed the adaptive chunk-boundary search
+try:
+    import webrtcvad
+    HAS_WEBRTCVAD = True
+except ImportError:
+    HAS_WEBRTCVAD = False
+
+# How many Google requests run in flight at once; the endpoint tolerates
+# small bursts and each request is ~1-3s of pure network wait
+GSR_CONCURRENCY = int(os.environ.get('GSR_CONCURRENCY', '4'))
+
+# Cut chunks at detected silences instead of fixed 30s marks when a VAD
+# backend is available; set to 0 to force the single-pass fixed split
+GSR_ADAPTIVE_CHUNKS = os.environ.get('GSR_ADAPTIVE_CHUNKS', '1') != '0'
+
+# Seconds per Google request chunk. Clamped to Google's ~30s ceiling;
+# smaller chunks trade more requests for lower per-request latency
+GSR_CHUNK_SEC = min(30.0, max(5.0, float(os.environ.get('GSR_CHUNK_SEC', '30'))))
+
+# Language-code map for Google Speech Recognition, built once at import
+_LANG_MAP = {
+    'en': 'en-US', 'en-us': 'en-US', 'en-gb': 'en-GB',
+    'es': 'es-ES', 'fr': 'fr-FR', 'de': 'de-DE',
+    'it': 'it-IT', 'pt': 'pt-BR', 'ru': 'ru-RU',
+    'zh': 'zh-CN', 'ja': 'ja-JP', 'ko': 'ko-KR',
+    'hi': 'hi-IN', 'ar': 'ar-SA', 'nl': 'nl-NL',
+    'pl': 'pl-PL', 'tr': 'tr-TR', 'sv': 'sv-SE'
+}
+
+# Minimum spacing between request starts plus bounded retries keeps the
+# parallel path inside Google's informal rate limits instead of dropping
+# chunks on the first transient 429
+_MIN_REQUEST_INTERVAL = float(os.environ.get('GSR_MIN_INTERVAL', '0.1'))
+_RETRY_BASE_WAIT = 1.0
+_RETRY_MAX_WAIT = 8.0
+_last_call_lock = threading.Lock()
+_last_call_time = 0.0
+
+# Persistent transcription cache: re-running on the same audio (common
+# during dev and re-processing) costs zero API calls on a full hit, and
+# per-chunk entries let partial re-runs skip already-transcribed audio
+CACHE_DIR = os.environ.get('TRANSCRIBE_CACHE_DIR',
+                           os.path.expanduser('~/.cache/transcribe'))
+CACHE_MAX_BYTES = int(os.environ.get('TRANSCRIBE_CACHE_MAX_MB', '200')) * 1024 * 1024
+
+
+def _write_json(path: str, obj) -> None:
+    """Serialize compactly — the output is machine-read by the pipeline.
+
+    orjson dumps several times faster than stdlib json; without it,
+    compact separators still beat pretty-printing on both time and size.
+    """
+    if HAS_ORJSON:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_get(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_put(path: str, obj) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        _write_json(tmp, obj)
+        os.replace(tmp, path)
+        _evict_cache()
+    except OSError:
+        pass
+
+
+def _evict_cache() -> None:
+    """Drop oldest cache entries until the directory fits the budget."""
+    entries = []
+    total = 0
+    for root, _dirs, files in os.walk(CACHE_DIR):
+        for name in files:
+            full = os.path.join(root, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, full))
+            total += st.st_size
+    if total <= CACHE_MAX_BYTES:
+        return
+    entries.sort()
+    for _mtime, size, full in entries:
+        try:
+            os.remove(full)
+            total -= size
+        except OSError:
+            continue
+        if total <= CACHE_MAX_BYTES:
+            break
+
+
+def _throttle():
+    """Enforce the minimum interval between request starts across threads."""
+    global _last_call_time
+    with _last_call_lock:
+        now = time.monotonic()
+        wait = _last_call_time + _MIN_REQUEST_INTERVAL - now
+        if wait > 0:
+            time.sleep(wait)
+            now = time.monotonic()
+        _last_call_time = now
+
+
+def _recognize_with_retry(recognizer, audio, lang_code):
+    """Call recognize_google with throttling and exponential backoff.
+
+    Transient throttling errors (429/quota/unavailable) are retried up to
+    three times with doubling waits; real failures propagate unchanged.
+    """
+    for attempt in range(3):
+        _throttle()
+        try:
+            return recognizer.recognize_google(audio, language=lang_code)
+        except sr.RequestError as e:
+            msg = str(e).lower()
+            transient = ('429' in msg or 'quota' in msg
+                         or 'rate' in msg or 'unavailable' in msg)
+            if transient and attempt < 2:
+                time.sleep(min(_RETRY_MAX_WAIT, _RETRY_BASE_WAIT * 2 ** attempt))
+                continue
+            raise
+
 def main():
     if len(sys.argv) < 4:
         print("Usage: python transcribe.py <audio_file> <language> <output_file>", file=sys.stderr)
@@ -28,17 +189,35 @@ def main():
     file_size = os.path.getsize(audio_file)
     file_size_mb = file_size / (1024 * 1024)
     print(f"Transcribing {audio_file} ({file_size_mb:.1f}MB) using Google Speech Recognition (free)...", file=sys.stderr)
-    
+
+    # Full-file cache hit: same audio + language was already transcribed
+    file_hash = _hash_file(audio_file)
+    cache_file = os.path.join(CACHE_DIR, f"{file_hash}_{language}.json")
+    cached = _cache_get(cache_file)
+    if cached is not None:
+        _write_json(output_file, cached)
+        print(f"Transcription cache hit: {cached.get('total_segments', 0)} segments", file=sys.stderr)
+        print(f"Saved to: {output_file}", file=sys.stderr)
+        return
+
     # Convert to WAV format required by SpeechRecognition
     wav_file = audio_file.rsplit('.', 1)[0] + '_sr.wav'
     print(f"Converting to WAV format...", file=sys.stderr)
     
-    subprocess.run([
-        'ffmpeg', '-y', '-i', audio_file,
+    # -loglevel error keeps stderr down to the actual failure reason;
+    # checking returncode (not just file existence) catches a truncated
+    # WAV from a late ffmpeg death before it wastes API quota
+    r = subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error', '-i', audio_file,
         '-ar', '16000', '-ac', '1', '-f', 'wav',
         wav_file
-    ], capture_output=True)
-    
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    if r.returncode != 0:
+        print(f"Error: WAV conversion failed (ffmpeg exit {r.returncode})", file=sys.stderr)
+        print(r.stderr.decode('utf-8', errors='replace')[-2000:], file=sys.stderr)
+        sys.exit(1)
+
     if not os.path.exists(wav_file):
         print(f"Error: Failed to convert audio to WAV", file=sys.stderr)
         sys.exit(1)
@@ -48,15 +227,7 @@ def main():
     print(f"Audio duration: {duration:.1f} seconds ({duration/60:.1f} minutes)", file=sys.stderr)
     
     # Map language codes
-    lang_map = {
-        'en': 'en-US', 'en-us': 'en-US', 'en-gb': 'en-GB',
-        'es': 'es-ES', 'fr': 'fr-FR', 'de': 'de-DE',
-        'it': 'it-IT', 'pt': 'pt-BR', 'ru': 'ru-RU',
-        'zh': 'zh-CN', 'ja': 'ja-JP', 'ko': 'ko-KR',
-        'hi': 'hi-IN', 'ar': 'ar-SA', 'nl': 'nl-NL',
-        'pl': 'pl-PL', 'tr': 'tr-TR', 'sv': 'sv-SE'
-    }
-    lang_code = lang_map.get(language.lower(), language)
+    lang_code = _LANG_MAP.get(language.lower(), language)
     
     # Transcribe in chunks
     segments = transcribe_chunked(wav_file, lang_code, duration)
@@ -71,22 +242,24 @@ def main():
         print("Warning: Transcription produced no segments", file=sys.stderr)
         segments = []
     
-    # Calculate full text
-    full_text = " ".join([seg["text"] for seg in segments if seg.get("text")])
-    
-    # Build output structure
+    # Calculate full text (generator — no intermediate list)
+    full_text = " ".join(seg["text"] for seg in segments if seg.get("text"))
+
+    # Build output structure; segment ends are already rounded at
+    # construction, so the last one is reused as-is
     output = {
         "language": language,
         "full_text": full_text.strip(),
         "segments": segments,
         "total_segments": len(segments),
-        "total_duration": round(segments[-1]["end"], 3) if segments else 0
+        "total_duration": segments[-1]["end"] if segments else 0
     }
     
     # Write JSON output for segment-based processing
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-    
+    _write_json(output_file, output)
+
+    _cache_put(cache_file, output)
+
     print(f"Transcription complete: {len(segments)} segments", file=sys.stderr)
     print(f"Total duration: {output['total_duration']}s", file=sys.stderr)
     print(f"Saved to: {output_file}", file=sys.stderr)
@@ -103,44 +276,99 @@ def get_audio_duration(wav_file: str) -> float:
     except:
         return 0
 
+# Seconds of audio shared between adjacent chunks. Fixed-time cuts land
+# mid-word at every seam; a small overlap (e.g. 2s) lets the merge phase
+# drop the duplicated words and keep boundary speech intact. 0 keeps the
+# fast single-pass split.
+OVERLAP_SEC = float(os.environ.get('OVERLAP_SEC', '0'))
+
+
+def _strip_overlap_words(prev_text: str, text: str, max_words: int = 8) -> str:
+    """Drop words at the start of `text` already heard at the end of
+    `prev_text` (longest matching run wins)."""
+    if not prev_text or not text:
+        return text
+    prev_words = prev_text.lower().split()
+    words = text.split()
+    limit = min(max_words, len(prev_words), len(words))
+    for n in range(limit, 0, -1):
+        if prev_words[-n:] == [w.lower() for w in words[:n]]:
+            return " ".join(words[n:])
+    return text
+
+
+# Chunks quieter than this RMS (int16 scale) skip the API call entirely —
+# intros, pauses, and credits would only come back as UnknownValueError
+# after a full network round-trip
+_SILENCE_RMS_THRESHOLD = int(os.environ.get('GSR_SILENCE_RMS', '200'))
+
+
+def _chunk_is_silent(raw: bytes) -> bool:
+    """Cheap in-process RMS check on raw s16le PCM."""
+    if not HAS_NUMPY:
+        return False
+    x = np.frombuffer(raw[:len(raw) - len(raw) % 2], dtype=np.int16)
+    if x.size == 0:
+        return True
+    if np.abs(x).max() < 500:
+        return True
+    rms = np.sqrt((x.astype(np.float32) ** 2).mean())
+    return rms < _SILENCE_RMS_THRESHOLD
+
+
+# One shared Recognizer: per-chunk construction rebuilt threshold state
+# for nothing, and recognize_google only reads its settings
+_recognizer = sr.Recognizer()
+
+
 def transcribe_chunk(args):
     """Transcribe a single chunk - for parallel processing"""
-    chunk_file, chunk_start, chunk_num, lang_code = args
-    
-    recognizer = sr.Recognizer()
-    
+    chunk_file, chunk_start, chunk_num, lang_code, chunk_duration = args
+
     try:
-        with sr.AudioFile(chunk_file) as source:
-            audio = recognizer.record(source)
-        
-        # Use Google's free speech recognition
-        text = recognizer.recognize_google(audio, language=lang_code)
-        
-        # Get chunk duration
-        duration = get_audio_duration(chunk_file)
-        
+        # Chunks are raw s16le PCM, so one read() builds the AudioData
+        # directly — no WAV header parse or record() copy per chunk
+        with open(chunk_file, 'rb') as f:
+            raw = f.read()
+
+        if _chunk_is_silent(raw):
+            return {
+                "chunk_num": chunk_num,
+                "start": chunk_start,
+                "end": chunk_start + chunk_duration,
+                "text": "",
+                "success": True
+            }
+
+        # Per-chunk cache keyed on the PCM content itself, so partial
+        # re-runs skip API calls for audio already transcribed
+        chunk_key = hashlib.sha256(raw + lang_code.encode()).hexdigest()
+        chunk_cache = os.path.join(CACHE_DIR, 'chunks', chunk_key + '.json')
+        cached = _cache_get(chunk_cache)
+        if cached is not None:
+            text = cached.get("text", "")
+        else:
+            audio = sr.AudioData(raw, 16000, 2)
+            try:
+                # Use Google's free speech recognition
+                text = _recognize_with_retry(_recognizer, audio, lang_code)
+            except sr.UnknownValueError:
+                # No speech detected in this chunk
+                text = ""
+            _cache_put(chunk_cache, {"text": text})
+
         return {
             "chunk_num": chunk_num,
             "start": chunk_start,
-            "end": chunk_start + duration,
+            "end": chunk_start + chunk_duration,
             "text": text.strip(),
             "success": True
         }
-    except sr.UnknownValueError:
-        # No speech detected in this chunk
-        duration = get_audio_duration(chunk_file)
-        return {
-            "chunk_num": chunk_num,
-            "start": chunk_start,
-            "end": chunk_start + duration,
-            "text": "",
-            "success": True
-        }
     except sr.RequestError as e:
         return {
             "chunk_num": chunk_num,
             "start": chunk_start,
-            "end": chunk_start + 30,
+            "end": chunk_start + chunk_duration,
             "text": "",
             "success": False,
             "error": str(e)
@@ -149,92 +377,297 @@ def transcribe_chunk(args):
         return {
             "chunk_num": chunk_num,
             "start": chunk_start,
-            "end": chunk_start + 30,
+            "end": chunk_start + chunk_duration,
             "text": "",
             "success": False,
             "error": str(e)
         }
 
-def transcribe_chunked(wav_file: str, lang_code: str, total_duration: float) -> list:
-    """Transcribe audio in chunks using Google Speech Recognition"""
-    import tempfile
-    
-    # Split into 30-second chunks (Google's limit)
-    chunk_duration = 30
+def find_cut_points(wav_file: str, max_chunk: float = 30.0,
+                    target_range: tuple = (25.0, 30.0)):
+    """Pick chunk boundaries at silences instead of fixed 30s marks.
+
+    Scans 30ms frames (webrtcvad when installed, RMS energy otherwise)
+    and cuts each chunk at the longest silence inside the target window,
+    so Google never gets audio sliced mid-word. Returns a list of
+    (start, duration) pairs, or None when no VAD backend is available.
+    """
+    if not HAS_NUMPY:
+        return None
+    import wave
+    try:
+        with wave.open(wav_file, 'rb') as wf:
+            sr_hz = wf.getframerate()
+            raw = wf.readframes(wf.getnframes())
+    except (OSError, wave.Error):
+        return None
+
+    x = np.frombuffer(raw, dtype=np.int16)
+    frame_len = int(sr_hz * 0.03)
+    if frame_len == 0 or x.size < frame_len:
+        return None
+    nframes = x.size // frame_len
+    frames = x[:nframes * frame_len].reshape(nframes, frame_len)
+
+    if HAS_WEBRTCVAD:
+        vad = webrtcvad.Vad(2)
+        voiced = np.fromiter(
+            (vad.is_speech(fr.tobytes(), sr_hz) for fr in frames),
+            dtype=bool, count=nframes)
+    else:
+        rms = np.sqrt((frames.astype(np.float32) ** 2).mean(axis=1))
+        voiced = rms >= _SILENCE_RMS_THRESHOLD
+
+    frame_sec = frame_len / sr_hz
+    total = x.size / sr_hz
+    cuts = []
+    start = 0.0
+    while total - start > max_chunk:
+        lo = int((start + target_range[0]) / frame_sec)
+        hi = min(int((start + target_range[1]) / frame_sec), nframes)
+        # Longest silent run in the window wins; hard cut if none
+        best_cut = start + max_chunk
+        best_len = 0
+        run_start = None
+        for idx in range(lo, hi):
+            if not voiced[idx]:
+                if run_start is None:
+                    run_start = idx
+            elif run_start is not None:
+                if idx - run_start > best_len:
+                    best_len = idx - run_start
+                    best_cut = (run_start + idx) / 2 * frame_sec
+                run_start = None
+        if run_start is not None and hi - run_start > best_len:
+            best_cut = (run_start + hi) / 2 * frame_sec
+        cuts.append((start, best_cut - start))
+        start = best_cut
+    cuts.append((start, total - start))
+    return cuts
+
+
+def _transcribe_cuts(wav_file: str, lang_code: str, cuts: list,
+                     tmpdir: str) -> list:
+    """Transcribe VAD-chosen (start, duration) chunks."""
+    completed = 0
     segments = []
-    chunk_start = 0
-    chunk_num = 0
-    chunk_files = []
-    chunk_args = []
-    
-    tmpdir = tempfile.mkdtemp()
-    
-    print(f"Splitting audio into {int(total_duration / chunk_duration) + 1} chunks...", file=sys.stderr)
-    
-    # Create all chunks first
-    while chunk_start < total_duration:
-        chunk_num += 1
-        chunk_file = os.path.join(tmpdir, f"chunk_{chunk_num}.wav")
-        
-        # Extract chunk using ffmpeg
-        subprocess.run([
-            'ffmpeg', '-y', '-i', wav_file,
-            '-ss', str(chunk_start),
-            '-t', str(chunk_duration),
-            '-ar', '16000', '-ac', '1',
-            chunk_file
-        ], capture_output=True)
-        
-        if os.path.exists(chunk_file) and os.path.getsize(chunk_file) > 1000:
-            chunk_files.append(chunk_file)
-            chunk_args.append((chunk_file, chunk_start, chunk_num, lang_code))
-        
-        chunk_start += chunk_duration
-    
-    print(f"Transcribing {len(chunk_args)} chunks...", file=sys.stderr)
-    
-    # Process chunks with progress updates
+    with ThreadPoolExecutor(max_workers=GSR_CONCURRENCY) as executor:
+        futures = []
+        for i, (start, duration) in enumerate(cuts):
+            chunk_file = os.path.join(tmpdir, f'chunk_{i:04d}.pcm')
+            r = subprocess.run([
+                'ffmpeg', '-y', '-loglevel', 'error',
+                '-ss', str(start), '-t', str(duration),
+                '-i', wav_file, '-ar', '16000', '-ac', '1', '-f', 's16le',
+                chunk_file
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if r.returncode == 0 and os.path.getsize(chunk_file) > 1000:
+                futures.append(executor.submit(
+                    transcribe_chunk,
+                    (chunk_file, start, len(futures) + 1, lang_code, duration)))
+
+        print(f"Transcribing {len(futures)} chunks (silence-aligned)...", file=sys.stderr)
+
+        pending = {}
+        next_num = 1
+        segment_id = 0
+        for future in as_completed(futures):
+            result = future.result()
+            pending[result["chunk_num"]] = result
+            completed += 1
+
+            while next_num in pending:
+                r = pending.pop(next_num)
+                next_num += 1
+                if r.get("text"):
+                    segments.append({
+                        "id": segment_id,
+                        "start": round(r["start"], 3),
+                        "end": round(r["end"], 3),
+                        "text": r["text"],
+                        "words": [],
+                        "duration": round(r["end"] - r["start"], 3)
+                    })
+                    segment_id += 1
+
+            if completed % 10 == 0 or completed == len(futures):
+                progress = int((completed / len(futures)) * 100)
+                print(f"Progress: {progress}% ({completed}/{len(futures)} chunks)", file=sys.stderr)
+
+    return segments
+
+
+def _transcribe_overlapped(wav_file: str, lang_code: str, total_duration: float,
+                           tmpdir: str, chunk_duration: float) -> list:
+    """Overlapping split path (OVERLAP_SEC > 0).
+
+    Adjacent chunks share OVERLAP_SEC seconds of audio so words cut at a
+    seam are heard whole by at least one chunk; the merge drops the
+    duplicated run and places boundaries at the overlap midpoint. Costs
+    one ffmpeg per chunk (the segment muxer cannot overlap), trading some
+    split speed for seam quality.
+    """
+    stride = max(1.0, chunk_duration - OVERLAP_SEC)
+    starts = []
+    s = 0.0
+    while s < total_duration:
+        starts.append(s)
+        s += stride
+
     results = []
-    completed = 0
-    
-    # Process sequentially to avoid rate limits
-    for args in chunk_args:
-        result = transcribe_chunk(args)
-        results.append(result)
-        completed += 1
-        
-        if completed % 10 == 0 or completed == len(chunk_args):
-            progress = int((completed / len(chunk_args)) * 100)
-            print(f"Progress: {progress}% ({completed}/{len(chunk_args)} chunks)", file=sys.stderr)
-    
-    # Sort results by chunk number and build segments
+    with ThreadPoolExecutor(max_workers=GSR_CONCURRENCY) as executor:
+        futures = []
+        for i, start in enumerate(starts):
+            chunk_file = os.path.join(tmpdir, f'chunk_{i:04d}.pcm')
+            duration = min(chunk_duration, total_duration - start)
+            r = subprocess.run([
+                'ffmpeg', '-y', '-loglevel', 'error',
+                '-ss', str(start), '-t', str(chunk_duration),
+                '-i', wav_file, '-ar', '16000', '-ac', '1', '-f', 's16le',
+                chunk_file
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if r.returncode == 0 and os.path.getsize(chunk_file) > 1000:
+                futures.append(executor.submit(
+                    transcribe_chunk, (chunk_file, start, i + 1, lang_code, duration)))
+        for future in as_completed(futures):
+            results.append(future.result())
+
     results.sort(key=lambda x: x["chunk_num"])
-    
+
+    half = OVERLAP_SEC / 2
+    segments = []
     segment_id = 0
-    for result in results:
-        if result.get("text"):
+    prev_text = ""
+    for idx, result in enumerate(results):
+        text = _strip_overlap_words(prev_text, result.get("text", ""))
+        prev_text = result.get("text", "")
+        if text:
+            start = result["start"] + (half if idx > 0 else 0)
+            end = result["end"] - (half if idx < len(results) - 1 else 0)
             segments.append({
                 "id": segment_id,
-                "start": round(result["start"], 3),
-                "end": round(result["end"], 3),
-                "text": result["text"],
+                "start": round(start, 3),
+                "end": round(end, 3),
+                "text": text,
                 "words": [],
-                "duration": round(result["end"] - result["start"], 3)
+                "duration": round(end - start, 3)
             })
             segment_id += 1
-    
-    # Clean up chunk files
-    for chunk_file in chunk_files:
-        try:
-            os.remove(chunk_file)
-        except:
-            pass
-    try:
-        os.rmdir(tmpdir)
-    except:
-        pass
-    
     return segments
 
+
+def transcribe_chunked(wav_file: str, lang_code: str, total_duration: float) -> list:
+    """Transcribe audio in chunks using Google Speech Recognition"""
+    import glob
+    import tempfile
+
+    # Split into chunks no longer than Google's ~30s limit
+    chunk_duration = GSR_CHUNK_SEC
+    segments = []
+
+    # TemporaryDirectory guarantees the chunk files are removed even when
+    # transcription raises, instead of leaking hundreds of MB of PCM
+    with tempfile.TemporaryDirectory(prefix='transcribe_') as tmpdir:
+        if OVERLAP_SEC > 0:
+            return _transcribe_overlapped(wav_file, lang_code, total_duration,
+                                          tmpdir, chunk_duration)
+
+        # Silence-aligned boundaries when a VAD backend is available —
+        # fixed-time cuts land mid-word at every seam
+        if GSR_ADAPTIVE_CHUNKS:
+            cuts = find_cut_points(wav_file, max_chunk=float(chunk_duration))
+            if cuts:
+                return _transcribe_cuts(wav_file, lang_code, cuts, tmpdir)
+
+        print(f"Splitting audio into {int(total_duration / chunk_duration) + 1} chunks...", file=sys.stderr)
+
+        # One segmenting pass: the segment muxer emits every chunk from a
+        # single decode instead of one ffmpeg fork + full decode per chunk.
+        # Segments are raw s16le PCM so workers can slurp them straight into
+        # sr.AudioData without a WAV header parse. Run it as a Popen and
+        # dispatch each chunk as soon as the muxer moves on to the next file,
+        # so Google requests overlap the decode instead of waiting for it.
+        proc = subprocess.Popen([
+            'ffmpeg', '-y', '-loglevel', 'error', '-i', wav_file,
+            '-ar', '16000', '-ac', '1',
+            '-f', 'segment', '-segment_time', str(chunk_duration),
+            '-segment_format', 's16le', '-reset_timestamps', '1',
+            os.path.join(tmpdir, 'chunk_%04d.pcm')
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        completed = 0
+
+        with ThreadPoolExecutor(max_workers=GSR_CONCURRENCY) as executor:
+            futures = []
+            dispatched = 0
+
+            while True:
+                running = proc.poll() is None
+                chunk_files = sorted(glob.glob(os.path.join(tmpdir, 'chunk_*.pcm')))
+                # The highest-numbered file may still be open while the
+                # segmenter runs; it is complete once the next one appears
+                ready_count = max(0, len(chunk_files) - 1) if running else len(chunk_files)
+
+                while dispatched < ready_count:
+                    i = dispatched
+                    chunk_file = chunk_files[i]
+                    if running or i < len(chunk_files) - 1:
+                        # Chunk durations are known from the fixed segment
+                        # time, so no per-chunk ffprobe fork is needed
+                        duration = float(chunk_duration)
+                    else:
+                        duration = max(0.0, min(chunk_duration, total_duration - i * chunk_duration))
+                    if os.path.getsize(chunk_file) > 1000:
+                        # chunk_num is the submission sequence so the
+                        # drain below sees a contiguous 1..N range even
+                        # when undersized files are skipped
+                        futures.append(executor.submit(
+                            transcribe_chunk,
+                            (chunk_file, i * chunk_duration, len(futures) + 1,
+                             lang_code, duration)))
+                    dispatched += 1
+
+                if not running:
+                    break
+                time.sleep(0.5)
+
+            if proc.returncode != 0:
+                print(f"Warning: chunk split exited {proc.returncode}; "
+                      f"transcribing the {len(futures)} chunks it produced", file=sys.stderr)
+
+            print(f"Transcribing {len(futures)} chunks...", file=sys.stderr)
+
+            # Collect with progress updates; the requests have been running
+            # behind the dispatch loop the whole time. Results are drained
+            # in chunk order as they complete, so no separate sort +
+            # rebuild pass is needed afterwards.
+            pending = {}
+            next_num = 1
+            segment_id = 0
+            for future in as_completed(futures):
+                result = future.result()
+                pending[result["chunk_num"]] = result
+                completed += 1
+
+                while next_num in pending:
+                    r = pending.pop(next_num)
+                    next_num += 1
+                    if r.get("text"):
+                        segments.append({
+                            "id": segment_id,
+                            "start": round(r["start"], 3),
+                            "end": round(r["end"], 3),
+                            "text": r["text"],
+                            "words": [],
+                            "duration": round(r["end"] - r["start"], 3)
+                        })
+                        segment_id += 1
+
+                if completed % 10 == 0 or completed == len(futures):
+                    progress = int((completed / len(futures)) * 100)
+                    print(f"Progress: {progress}% ({completed}/{len(futures)} chunks)", file=sys.stderr)
+
+        return segments
+
 if __name__ == "__main__":
     main()
@@ -6,9 +6,364 @@ Supports 40+ languages with context-aware translation.
 """
 import sys
 import os
+import functools
+import io
 import json
+import re
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import types
 import urllib.request
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# aiohttp enables concurrent batch translation; the sequential path
+# remains as fallback when it is not installed
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# requests gives us a keep-alive session so repeated API calls reuse one
+# TLS connection instead of paying a fresh handshake each time
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+# tiktoken sharpens the token estimates used for batch packing; the
+# len//4 heuristic is close enough when it is missing
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+# orjson speeds up the request/response bodies on the hot translation
+# path; stdlib json remains for stdout report lines
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+    _loads = json.loads
+
+# How many OpenAI batch requests run in flight at once
+TRANSLATE_CONCURRENCY = int(os.environ.get("TRANSLATE_CONCURRENCY", "5"))
+
+# Hedged mode fires DeepL and OpenAI together and keeps the first success.
+# Off by default since it can double per-line API cost.
+TRANSLATE_HEDGE = os.environ.get("TRANSLATE_HEDGE", "0") == "1"
+
+# Same-language requests (misconfigured pipelines, test harnesses) skip
+# the network and echo the input; set to 1 to force real translation,
+# e.g. for en-US -> en-GB localization
+_ALLOW_SAME_LANG = os.environ.get("TRANSLATE_ALLOW_SAME_LANG", "0") == "1"
+
+
+def _same_language(source_lang: str, target_lang: str) -> bool:
+    """True when the language pair needs no translation."""
+    if _ALLOW_SAME_LANG:
+        return False
+    return (source_lang == target_lang
+            or source_lang.partition("-")[0] == target_lang.partition("-")[0])
+
+
+def _noop_result(text: str, source_lang: str, target_lang: str) -> dict:
+    """Echo the input in the standard result shape without an API call."""
+    return {
+        "success": True,
+        "translation": text,
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "source_length": len(text),
+        "translation_length": len(text),
+        "engine": "noop"
+    }
+
+
+# Circuit breaker: after an auth/quota/rate-limit failure DeepL keeps
+# failing for a while, so skip straight to OpenAI instead of paying a
+# doomed round-trip on every translation
+_DEEPL_BREAKER_SECONDS = float(os.environ.get("DEEPL_BREAKER_SECONDS", "300"))
+_DEEPL_BREAKER = {"until": 0.0, "tripped": False}
+
+
+def _trip_deepl_breaker(code: int):
+    _DEEPL_BREAKER["until"] = time.monotonic() + _DEEPL_BREAKER_SECONDS
+    if not _DEEPL_BREAKER["tripped"]:
+        _DEEPL_BREAKER["tripped"] = True
+        print(f"DeepL circuit breaker tripped (HTTP {code}); "
+              f"skipping DeepL for {_DEEPL_BREAKER_SECONDS:.0f}s", file=sys.stderr)
+
+
+def _deepl_breaker_open() -> bool:
+    """True while DeepL should be skipped; logs when the window expires."""
+    if _DEEPL_BREAKER["until"] > time.monotonic():
+        return True
+    if _DEEPL_BREAKER["tripped"]:
+        _DEEPL_BREAKER["tripped"] = False
+        print("DeepL circuit breaker reset; trying DeepL again", file=sys.stderr)
+    return False
+
+# Estimated input+output token budget per translation batch
+_BATCH_TOKEN_BUDGET = int(os.environ.get("TRANSLATE_BATCH_TOKENS", "3500"))
+
+class TokenBucket:
+    """Lazily refilled request/token budget for the OpenAI API.
+
+    acquire() only sleeps when the local bucket is actually drained, and
+    observe() corrects local drift from the server's x-ratelimit-*
+    response headers, so throttling tracks the real quota instead of a
+    fixed pessimistic delay.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60.0)
+        self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60.0)
+
+    def acquire(self, tokens: int = 0):
+        """Block until one request plus `tokens` tokens fit in the budget."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.requests >= 1 and self.tokens >= tokens:
+                    self.requests -= 1
+                    self.tokens -= tokens
+                    return
+                wait = max((1 - self.requests) * 60.0 / self.rpm,
+                           (tokens - self.tokens) * 60.0 / self.tpm)
+            time.sleep(max(0.05, min(wait, 5.0)))
+
+    def observe(self, headers):
+        """Clamp the local budget to what the server says is left."""
+        for attr, name in (("requests", "x-ratelimit-remaining-requests"),
+                           ("tokens", "x-ratelimit-remaining-tokens")):
+            value = headers.get(name)
+            if value is not None:
+                try:
+                    value = float(value)
+                except ValueError:
+                    continue
+                with self.lock:
+                    setattr(self, attr, min(getattr(self, attr), value))
+
+
+_bucket = TokenBucket(int(os.environ.get("TRANSLATE_RPM", "500")),
+                      int(os.environ.get("TRANSLATE_TPM", "200000")))
+
+_tok_encoding = None
+
+
+def _tok_est(text: str) -> int:
+    """Estimate the token count of one line."""
+    global _tok_encoding
+    if HAS_TIKTOKEN:
+        if _tok_encoding is None:
+            _tok_encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+        return len(_tok_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def _pack_batches(texts: list, budget: int = 0) -> list:
+    """Greedily pack lines into batches of roughly `budget` tokens.
+
+    Short dialogue packs densely (fewer round-trips amortize the request
+    overhead); long narration splits early so the translated output
+    stays inside the completion limit instead of truncating.
+    """
+    budget = budget or _BATCH_TOKEN_BUDGET
+    batches = []
+    batch = []
+    total = 0
+    for text in texts:
+        cost = _tok_est(text) * 2  # the line plus its translation
+        if batch and total + cost > budget:
+            batches.append(batch)
+            batch, total = [], 0
+        batch.append(text)
+        total += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _payload_tokens(payload: dict) -> int:
+    """Estimated tokens one chat payload will consume (prompt + completion)."""
+    return (payload.get("max_completion_tokens", 0)
+            + sum(_tok_est(m["content"]) for m in payload.get("messages", ())))
+
+# Persistent translation cache: repeated lines ("Yes.", "Okay.", character
+# names) and resumed/re-dubbed jobs skip the network entirely
+TRANSLATE_CACHE_DB = os.path.expanduser(
+    os.environ.get("TRANSLATE_CACHE_DB", "~/.rampage/tx_cache.db"))
+TRANSLATE_CACHE_MAX_ROWS = int(os.environ.get("TRANSLATE_CACHE_MAX_ROWS", "100000"))
+
+_cache_lock = threading.Lock()
+_cache_conn = None
+_cache_puts = 0
+
+
+def _tx_cache():
+    """Open the SQLite translation cache once; returns None if unavailable."""
+    global _cache_conn
+    if _cache_conn is None:
+        try:
+            cache_dir = os.path.dirname(TRANSLATE_CACHE_DB)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            conn = sqlite3.connect(TRANSLATE_CACHE_DB, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tx("
+                "k BLOB PRIMARY KEY, v TEXT, ts INTEGER, hits INTEGER DEFAULT 0)")
+            conn.execute("CREATE INDEX IF NOT EXISTS tx_ts ON tx(ts)")
+            conn.commit()
+            _cache_conn = conn
+        except Exception:
+            _cache_conn = False  # don't retry on every lookup
+    return _cache_conn or None
+
+
+def _cache_key(text: str, source_lang: str, target_lang: str, engine: str = "openai") -> bytes:
+    """Stable 16-byte key for one (engine, language pair, text) tuple."""
+    return hashlib.blake2b(
+        f"{engine}|{source_lang}|{target_lang}|{text}".encode('utf-8'),
+        digest_size=16).digest()
+
+
+def _tx_cache_get(key: bytes):
+    """Return the cached translation for key, refreshing its LRU timestamp."""
+    conn = _tx_cache()
+    if conn is None:
+        return None
+    try:
+        with _cache_lock:
+            row = conn.execute("SELECT v FROM tx WHERE k = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE tx SET ts = ?, hits = hits + 1 WHERE k = ?",
+                             (int(time.time()), key))
+                conn.commit()
+        return row[0] if row else None
+    except Exception:
+        return None
+
+
+def _tx_cache_put(key: bytes, translation: str):
+    """Store one translation; periodically evicts oldest rows past the cap."""
+    global _cache_puts
+    conn = _tx_cache()
+    if conn is None:
+        return
+    try:
+        with _cache_lock:
+            conn.execute("INSERT OR REPLACE INTO tx(k, v, ts) VALUES(?, ?, ?)",
+                         (key, translation, int(time.time())))
+            _cache_puts += 1
+            if _cache_puts % 500 == 0:
+                conn.execute(
+                    "DELETE FROM tx WHERE k NOT IN "
+                    "(SELECT k FROM tx ORDER BY ts DESC LIMIT ?)",
+                    (TRANSLATE_CACHE_MAX_ROWS,))
+            conn.commit()
+    except Exception:
+        pass
+
+
+# Batch checkpoints for resumable timed-translation jobs
+_PARTIAL_DIR = os.path.expanduser(
+    os.environ.get("TRANSLATE_PARTIAL_DIR", "~/.rampage/partial"))
+
+
+def _partial_path(segments: list, source_lang: str, target_lang: str) -> str:
+    """Checkpoint file path derived from the job's identifying inputs."""
+    job_key = hashlib.blake2b(
+        (json.dumps([s.get('text', '') for s in segments[:5]], ensure_ascii=False)
+         + f"|{len(segments)}|{source_lang}|{target_lang}").encode('utf-8'),
+        digest_size=8).hexdigest()
+    return os.path.join(_PARTIAL_DIR, f"{job_key}.partial.jsonl")
+
+
+def _batch_key(batch_texts: list) -> str:
+    """Content hash identifying a batch by its texts, not its position.
+
+    Batch indices shift between runs (completed batches land in the SQLite
+    cache, shrinking miss_texts on resume), so checkpoints keyed by index
+    could attach old translations to the wrong lines.
+    """
+    return hashlib.blake2b(
+        json.dumps(batch_texts, ensure_ascii=False).encode('utf-8'),
+        digest_size=8).hexdigest()
+
+
+def _load_partial(path: str) -> dict:
+    """Read completed batches left behind by an interrupted run."""
+    done = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    done[entry["batch_key"]] = entry["translations"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        return {}
+    return done
+
+
+def _append_partial(path: str, batch_key: str, translations: list):
+    """Checkpoint one completed batch; failures here are non-fatal."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"batch_key": batch_key, "translations": translations},
+                               ensure_ascii=False) + "\n")
+    except OSError:
+        pass
+
+
+def _tx_cache_get_many(keys: list) -> dict:
+    """Bulk lookup; returns {key: translation} and refreshes hit timestamps."""
+    conn = _tx_cache()
+    if conn is None or not keys:
+        return {}
+    hits = {}
+    try:
+        unique = list(dict.fromkeys(keys))
+        now = int(time.time())
+        with _cache_lock:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for k, v in conn.execute(
+                        f"SELECT k, v FROM tx WHERE k IN ({marks})", chunk):
+                    hits[bytes(k)] = v
+                conn.execute(
+                    f"UPDATE tx SET ts = ?, hits = hits + 1 WHERE k IN ({marks})",
+                    [now] + chunk)
+            conn.commit()
+    except Exception:
+        return {}
+    return hits
 
 
 # DeepL language code mapping (DeepL uses different codes for some languages)
@@ -103,24 +458,239 @@ SUPPORTED_LANGUAGES = {
 }
 
 
+# Frozen, merged lookup tables with base-code aliases materialized at
+# import time, so the hot path is a plain dict get with no branching
+_DEEPL_FULL = types.MappingProxyType({
+    **{k.partition("-")[0]: v for k, v in DEEPL_LANGUAGE_MAP.items()},
+    **DEEPL_LANGUAGE_MAP,
+})
+_LANG_FULL = types.MappingProxyType({
+    **{k.partition("-")[0]: v for k, v in SUPPORTED_LANGUAGES.items()},
+    **SUPPORTED_LANGUAGES,
+})
+
+
 def get_language_name(code: str) -> str:
     """Get human-readable language name from code."""
-    if code in SUPPORTED_LANGUAGES:
-        return SUPPORTED_LANGUAGES[code]
-    base_code = code.split("-")[0]
-    if base_code in SUPPORTED_LANGUAGES:
-        return SUPPORTED_LANGUAGES[base_code]
-    return code
+    return _LANG_FULL.get(code) or _LANG_FULL.get(code.partition("-")[0], code)
 
 
 def get_deepl_code(lang_code: str) -> str:
     """Convert language code to DeepL format."""
-    if lang_code in DEEPL_LANGUAGE_MAP:
-        return DEEPL_LANGUAGE_MAP[lang_code]
-    base_code = lang_code.split("-")[0]
-    if base_code in DEEPL_LANGUAGE_MAP:
-        return DEEPL_LANGUAGE_MAP[base_code]
-    return lang_code.upper()
+    return (_DEEPL_FULL.get(lang_code)
+            or _DEEPL_FULL.get(lang_code.partition("-")[0], lang_code.upper()))
+
+
+_http_session = None
+
+
+def _session():
+    """Lazily create the shared keep-alive HTTP session."""
+    global _http_session
+    if _http_session is None:
+        s = requests.Session()
+        s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+        _http_session = s
+    return _http_session
+
+
+def _post_json(url: str, data: bytes, headers: dict, timeout: int) -> dict:
+    """POST raw bytes and return the decoded JSON body.
+
+    Uses the shared requests.Session when available so sequential calls
+    reuse one TLS connection; falls back to urllib otherwise. Errors are
+    normalized to urllib.error exceptions so callers keep a single
+    error-handling path.
+    """
+    if HAS_REQUESTS:
+        try:
+            resp = _session().post(url, data=data, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            raise urllib.error.URLError(e)
+        _bucket.observe(resp.headers)
+        if resp.status_code >= 400:
+            raise urllib.error.HTTPError(url, resp.status_code, resp.reason,
+                                         hdrs=resp.headers, fp=io.BytesIO(resp.content))
+        return _loads(resp.content)
+
+    req = urllib.request.Request(url, data=data, headers=headers)
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return _loads(response.read())
+
+
+def _stream_chat_content(url: str, headers: dict, payload: dict, timeout: int = 180):
+    """Yield content deltas from a streamed chat completion (SSE).
+
+    Starts producing text at first-token latency instead of blocking for
+    the whole generation. Errors are normalized like _post_json.
+    """
+    payload = dict(payload, stream=True)
+    try:
+        resp = _session().post(url, json=payload, headers=headers,
+                               stream=True, timeout=timeout)
+    except requests.RequestException as e:
+        raise urllib.error.URLError(e)
+    _bucket.observe(resp.headers)
+    if resp.status_code >= 400:
+        raise urllib.error.HTTPError(url, resp.status_code, resp.reason,
+                                     hdrs=resp.headers, fp=io.BytesIO(resp.content))
+    with resp:
+        for line in resp.iter_lines():
+            if not line or not line.startswith(b"data: "):
+                continue
+            frame = line[6:]
+            if frame == b"[DONE]":
+                break
+            try:
+                delta = _loads(frame)["choices"][0].get("delta", {})
+            except (ValueError, KeyError, IndexError):
+                continue
+            content = delta.get("content")
+            if content:
+                yield content
+
+
+def _iter_json_translations(deltas):
+    """Yield each completed string element of the streamed translations array.
+
+    Works on the raw SSE delta stream: once the array opens, every string
+    literal whose closing quote has arrived is decoded and yielded, so
+    callers see translations at first-token latency.
+    """
+    buf = ""
+    started = False
+    for piece in deltas:
+        buf += piece
+        if not started:
+            idx = buf.find("[")
+            if idx < 0:
+                continue
+            buf = buf[idx + 1:]
+            started = True
+        while True:
+            start = buf.find('"')
+            if start < 0:
+                break
+            end = start
+            while True:
+                end = buf.find('"', end + 1)
+                if end < 0:
+                    break
+                # A quote preceded by an even number of backslashes closes
+                # the literal; otherwise it is escaped content
+                backslashes = 0
+                j = end - 1
+                while j >= 0 and buf[j] == "\\":
+                    backslashes += 1
+                    j -= 1
+                if backslashes % 2 == 0:
+                    break
+            if end < 0:
+                break
+            yield _loads(buf[start:end + 1])
+            buf = buf[end + 1:]
+
+
+def _openai_config():
+    """Resolve endpoint and auth for the OpenAI-compatible API, or None."""
+    base_url = os.environ.get("AI_INTEGRATIONS_OPENAI_BASE_URL")
+    api_key = os.environ.get("AI_INTEGRATIONS_OPENAI_API_KEY") or os.environ.get("OPENAI_API_KEY")
+    if not api_key or (api_key == "_DUMMY_API_KEY_" and not base_url):
+        return None
+    url = f"{base_url}/chat/completions" if base_url else "https://api.openai.com/v1/chat/completions"
+    return {
+        "url": url,
+        "headers": {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+    }
+
+
+def _build_openai_payload(batch: list, source_lang: str, target_lang: str, context: str = "") -> dict:
+    """Build the chat payload for one numbered-segment batch."""
+    source_name = get_language_name(source_lang)
+    target_name = get_language_name(target_lang)
+    context_hint = f" This is {context}." if context else ""
+
+    system_prompt = f"""You are a professional translator specializing in film and media translation.
+Translate every segment in the JSON array from {source_name} to {target_name}.{context_hint}
+
+Translation guidelines:
+- Maintain the original tone, emotion, and style
+- Use natural, conversational language appropriate for spoken dialogue
+- Preserve cultural nuances while adapting idioms for the target audience
+- Keep each segment at a similar length for voice-over timing
+- Return a JSON object {{"translations": [...]}} with exactly {len(batch)} strings in the same order
+- Do not add explanations or notes"""
+
+    # Only request the completion room this batch can plausibly use
+    est_input = sum(_tok_est(seg) for seg in batch)
+    max_tokens = min(4096, max(256, int(est_input * 1.5)))
+
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": json.dumps({"segments": batch}, ensure_ascii=False)}
+        ],
+        "temperature": 0.3,
+        "response_format": {"type": "json_object"},
+        "max_completion_tokens": max_tokens
+    }
+
+
+def _parse_json_translations(result_text: str) -> list:
+    """Parse a {"translations": [...]} JSON-mode response into a list."""
+    data = _loads(result_text)
+    translations = data.get("translations") if isinstance(data, dict) else None
+    if not isinstance(translations, list):
+        raise ValueError("model response missing 'translations' array")
+    return [str(t).strip() for t in translations]
+
+
+async def _translate_batch_async(session, sem, url: str, headers: dict,
+                                 payload: dict, max_retries: int = 3):
+    """POST one batch with 429/5xx backoff; returns the parsed JSON body."""
+    async with sem:
+        for attempt in range(max_retries):
+            try:
+                await asyncio.to_thread(_bucket.acquire, _payload_tokens(payload))
+                async with session.post(
+                        url, json=payload, headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=180)) as resp:
+                    _bucket.observe(resp.headers)
+                    if resp.status == 429 or resp.status >= 500:
+                        if attempt < max_retries - 1:
+                            try:
+                                wait = float(resp.headers.get("Retry-After"))
+                            except (TypeError, ValueError):
+                                wait = (2 ** attempt) * 5
+                            await asyncio.sleep(wait)
+                            continue
+                    resp.raise_for_status()
+                    return _loads(await resp.read())
+            except aiohttp.ClientError:
+                if attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep((2 ** attempt) * 3)
+    raise RuntimeError("Batch translation failed after retries")
+
+
+def _translate_batches_async(payloads: list, url: str, headers: dict) -> list:
+    """Run all batch requests concurrently behind a bounded semaphore.
+
+    Latency becomes roughly max-of-batches instead of sum-of-batches;
+    exceptions come back in-slot via return_exceptions.
+    """
+    async def _run():
+        sem = asyncio.Semaphore(TRANSLATE_CONCURRENCY)
+        connector = aiohttp.TCPConnector(limit=TRANSLATE_CONCURRENCY * 2)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(
+                *[_translate_batch_async(session, sem, url, headers, p) for p in payloads],
+                return_exceptions=True)
+    return asyncio.run(_run())
 
 
 def translate_with_deepl(text: str, source_lang: str, target_lang: str, context: str = "") -> dict:
@@ -136,15 +706,32 @@ def translate_with_deepl(text: str, source_lang: str, target_lang: str, context:
     Returns:
         dict with translation result
     """
+    if _same_language(source_lang, target_lang):
+        return _noop_result(text, source_lang, target_lang)
+
     api_key = os.environ.get("DEEPL_API_KEY")
-    
+
     if not api_key:
         return {
             "success": False,
             "error": "DeepL API key not found. Set DEEPL_API_KEY environment variable.",
             "fallback": True
         }
-    
+
+    cache_key = _cache_key(text, source_lang, target_lang, engine="deepl")
+    cached = _tx_cache_get(cache_key)
+    if cached is not None:
+        return {
+            "success": True,
+            "translation": cached,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "source_length": len(text),
+            "translation_length": len(cached),
+            "engine": "deepl",
+            "cached": True
+        }
+
     try:
         source_deepl = get_deepl_code(source_lang)
         target_deepl = get_deepl_code(target_lang)
@@ -170,17 +757,17 @@ def translate_with_deepl(text: str, source_lang: str, target_lang: str, context:
             data["formality"] = "prefer_less"
         
         encoded_data = urllib.parse.urlencode(data).encode('utf-8')
-        
-        req = urllib.request.Request(url, data=encoded_data, method='POST')
-        req.add_header('Content-Type', 'application/x-www-form-urlencoded')
-        
-        with urllib.request.urlopen(req, timeout=60) as response:
-            result = json.loads(response.read().decode('utf-8'))
+
+        result = _post_json(
+            url, encoded_data,
+            {'Content-Type': 'application/x-www-form-urlencoded'}, timeout=60)
         
         if "translations" in result and len(result["translations"]) > 0:
             translated_text = result["translations"][0]["text"]
             detected_lang = result["translations"][0].get("detected_source_language", source_lang)
-            
+
+            _tx_cache_put(cache_key, translated_text)
+
             return {
                 "success": True,
                 "translation": translated_text,
@@ -199,6 +786,8 @@ def translate_with_deepl(text: str, source_lang: str, target_lang: str, context:
             
     except urllib.error.HTTPError as e:
         error_msg = f"DeepL API error: {e.code}"
+        if e.code in (403, 429, 456):  # auth, rate limit, quota exhausted
+            _trip_deepl_breaker(e.code)
         try:
             error_body = e.read().decode('utf-8')
             error_data = json.loads(error_body)
@@ -232,10 +821,13 @@ def translate_with_openai(text: str, source_lang: str, target_lang: str, context
     Returns:
         dict with translation result
     """
+    if _same_language(source_lang, target_lang):
+        return _noop_result(text, source_lang, target_lang)
+
     # Check for Replit AI Integrations first, then standard OpenAI
     base_url = os.environ.get("AI_INTEGRATIONS_OPENAI_BASE_URL")
     api_key = os.environ.get("AI_INTEGRATIONS_OPENAI_API_KEY") or os.environ.get("OPENAI_API_KEY")
-    
+
     if not api_key or api_key == "_DUMMY_API_KEY_":
         # If using Replit AI Integrations with dummy key, that's fine if base_url is set
         if not base_url:
@@ -243,7 +835,22 @@ def translate_with_openai(text: str, source_lang: str, target_lang: str, context
                 "success": False,
                 "error": "OpenAI API key not found. Set OPENAI_API_KEY or configure AI Integrations."
             }
-    
+
+    cache_key = _cache_key(text, source_lang, target_lang, engine="openai")
+    cached = _tx_cache_get(cache_key)
+    if cached is not None:
+        return {
+            "success": True,
+            "translation": cached,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "source_length": len(text),
+            "translation_length": len(cached),
+            "model": "gpt-4o-mini",
+            "engine": "openai",
+            "cached": True
+        }
+
     try:
         source_name = get_language_name(source_lang)
         target_name = get_language_name(target_lang)
@@ -272,7 +879,7 @@ Translation guidelines:
         }
         
         # Use gpt-4o-mini for translation (supported by AI Integrations)
-        data = json.dumps({
+        data = _dumps({
             "model": "gpt-4o-mini",
             "messages": [
                 {"role": "system", "content": system_prompt},
@@ -280,15 +887,14 @@ Translation guidelines:
             ],
             "temperature": 0.3,
             "max_completion_tokens": 4096
-        }).encode('utf-8')
-        
-        req = urllib.request.Request(url, data=data, headers=headers)
+        })
         
-        with urllib.request.urlopen(req, timeout=120) as response:
-            result = json.loads(response.read().decode('utf-8'))
+        result = _post_json(url, data, headers, timeout=120)
         
         translated_text = result["choices"][0]["message"]["content"].strip()
-        
+
+        _tx_cache_put(cache_key, translated_text)
+
         return {
             "success": True,
             "translation": translated_text,
@@ -307,26 +913,22 @@ Translation guidelines:
         }
 
 
-def translate_text(text: str, source_lang: str, target_lang: str, context: str = "", engine: str = "auto") -> dict:
-    """
-    Translate text using the best available translation engine.
-    Tries DeepL first for higher accuracy, falls back to OpenAI GPT.
-    
-    Args:
-        text: Text to translate
-        source_lang: Source language code
-        target_lang: Target language code
-        context: Optional context about the content
-        engine: Translation engine to use ('auto', 'deepl', 'openai')
-    
-    Returns:
-        dict with translation result
-    """
+def _translate_text_impl(text: str, source_lang: str, target_lang: str, context: str = "", engine: str = "auto") -> dict:
+    """Uncached engine dispatch backing translate_text."""
     if engine == "deepl":
         return translate_with_deepl(text, source_lang, target_lang, context)
     elif engine == "openai":
         return translate_with_openai(text, source_lang, target_lang, context)
-    
+
+    if TRANSLATE_HEDGE:
+        return _translate_hedged(text, source_lang, target_lang, context)
+
+    if _deepl_breaker_open():
+        openai_result = translate_with_openai(text, source_lang, target_lang, context)
+        if openai_result.get("success"):
+            openai_result["engine"] = "openai (deepl breaker open)"
+        return openai_result
+
     deepl_result = translate_with_deepl(text, source_lang, target_lang, context)
     
     if deepl_result.get("success"):
@@ -339,10 +941,82 @@ def translate_text(text: str, source_lang: str, target_lang: str, context: str =
         if openai_result.get("success"):
             openai_result["engine"] = "openai (fallback)"
         return openai_result
-    
+
     return deepl_result
 
 
+class _TranslateFailure(Exception):
+    """Carries a failed result out of the memoized path uncached."""
+
+    def __init__(self, result):
+        self.result = result
+
+
+@functools.lru_cache(maxsize=1024)
+def _translate_text_cached(text: str, source_lang: str, target_lang: str, context: str, engine: str):
+    result = _translate_text_impl(text, source_lang, target_lang, context, engine)
+    if not result.get("success"):
+        # Raising keeps failures out of the cache so callers can retry
+        raise _TranslateFailure(result)
+    return types.MappingProxyType(result)
+
+
+def translate_text(text: str, source_lang: str, target_lang: str, context: str = "", engine: str = "auto") -> dict:
+    """
+    Translate text using the best available translation engine.
+    Tries DeepL first for higher accuracy, falls back to OpenAI GPT.
+    Successful results are memoized in-process, so repeated calls with
+    identical inputs (retry harnesses, resumed pipelines) are free.
+
+    Args:
+        text: Text to translate
+        source_lang: Source language code
+        target_lang: Target language code
+        context: Optional context about the content
+        engine: Translation engine to use ('auto', 'deepl', 'openai')
+
+    Returns:
+        dict with translation result
+    """
+    if _same_language(source_lang, target_lang):
+        return _noop_result(text, source_lang, target_lang)
+    if len(text) > 100_000:
+        return _translate_text_impl(text, source_lang, target_lang, context, engine)
+    try:
+        return dict(_translate_text_cached(text, source_lang, target_lang, context, engine))
+    except _TranslateFailure as e:
+        return e.result
+
+
+def _translate_hedged(text: str, source_lang: str, target_lang: str, context: str = "") -> dict:
+    """Fire DeepL and OpenAI concurrently and return the first success.
+
+    Latency is bounded by the faster engine instead of DeepL-then-OpenAI
+    in sequence, so a slow or timing-out DeepL no longer stalls the
+    pipeline. The losing request cannot be aborted mid-flight; its result
+    is simply discarded.
+    """
+    pool = ThreadPoolExecutor(max_workers=2)
+    try:
+        futures = {
+            pool.submit(translate_with_deepl, text, source_lang, target_lang, context): "deepl",
+            pool.submit(translate_with_openai, text, source_lang, target_lang, context): "openai",
+        }
+        first_error = None
+        for future in as_completed(futures):
+            result = future.result()
+            if result.get("success"):
+                engine = futures[future]
+                result["engine"] = f"{engine} (hedged)"
+                print(f"Translation completed using {engine} (hedged)", file=sys.stderr)
+                return result
+            if first_error is None:
+                first_error = result
+        return first_error or {"success": False, "error": "Both translation engines failed"}
+    finally:
+        pool.shutdown(wait=False)
+
+
 def translate_segments(segments: list, source_lang: str, target_lang: str, context: str = "", max_retries: int = 3) -> dict:
     """
     Translate a list of text segments (for subtitle-style translation).
@@ -358,91 +1032,99 @@ def translate_segments(segments: list, source_lang: str, target_lang: str, conte
     Returns:
         dict with translated segments
     """
-    import re
-    import time
-    
-    # Check for Replit AI Integrations first, then standard OpenAI
-    base_url = os.environ.get("AI_INTEGRATIONS_OPENAI_BASE_URL")
-    api_key = os.environ.get("AI_INTEGRATIONS_OPENAI_API_KEY") or os.environ.get("OPENAI_API_KEY")
-    
-    if not api_key or (api_key == "_DUMMY_API_KEY_" and not base_url):
+    cfg = _openai_config()
+    if cfg is None:
         return {
             "success": False,
             "error": "OpenAI API key not found"
         }
-    
-    source_name = get_language_name(source_lang)
-    target_name = get_language_name(target_lang)
-    
-    context_hint = f" This is {context}." if context else ""
-    
-    numbered_text = "\n".join([f"[{i+1}] {seg}" for i, seg in enumerate(segments)])
-    
-    system_prompt = f"""You are a professional translator specializing in film and media translation.
-Translate the following numbered segments from {source_name} to {target_name}.{context_hint}
+    url = cfg["url"]
+    headers = cfg["headers"]
 
-Translation guidelines:
-- Maintain the original tone, emotion, and style
-- Use natural, conversational language appropriate for spoken dialogue
-- Preserve cultural nuances while adapting idioms for the target audience
-- Keep each segment at a similar length for voice-over timing
-- Return translations in the same numbered format: [1] translation [2] translation etc.
-- Do not add explanations or notes"""
+    # Serve repeated/previously translated lines from the cache and only
+    # send the misses over the wire
+    keys = [_cache_key(seg, source_lang, target_lang) for seg in segments]
+    translated_segments = [None] * len(segments)
+    miss_idx = []
+    for i, key in enumerate(keys):
+        cached = _tx_cache_get(key)
+        if cached is not None:
+            translated_segments[i] = cached
+        else:
+            miss_idx.append(i)
+
+    if not miss_idx:
+        return {
+            "success": True,
+            "translations": translated_segments,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "segment_count": len(translated_segments),
+            "cached_count": len(segments),
+            "model": "gpt-4o-mini"
+        }
+
+    miss_texts = [segments[i] for i in miss_idx]
+
+    # Collapse duplicate lines within the batch; each distinct line is
+    # sent (and billed) once, then fanned back out to every occurrence
+    unique = {}
+    for text in miss_texts:
+        unique.setdefault(text, len(unique))
+    unique_texts = list(unique)
+
+    payload = _build_openai_payload(unique_texts, source_lang, target_lang, context)
+    data = _dumps(payload)
 
-    # Use Replit AI Integrations base URL if available, otherwise standard OpenAI
-    if base_url:
-        url = f"{base_url}/chat/completions"
-    else:
-        url = "https://api.openai.com/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    data = json.dumps({
-        "model": "gpt-4o-mini",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": numbered_text}
-        ],
-        "temperature": 0.3,
-        "max_completion_tokens": 4096
-    }).encode('utf-8')
-    
     last_error = None
     for attempt in range(max_retries):
         try:
-            req = urllib.request.Request(url, data=data, headers=headers)
-            
-            with urllib.request.urlopen(req, timeout=180) as response:
-                result = json.loads(response.read().decode('utf-8'))
-            
-            result_text = result["choices"][0]["message"]["content"].strip()
-            
-            translated_segments = []
-            matches = re.findall(r'\[(\d+)\]\s*(.+?)(?=\[\d+\]|$)', result_text, re.DOTALL)
-            
-            for match in matches:
-                translated_segments.append(match[1].strip())
-            
-            if len(translated_segments) != len(segments):
-                translated_segments = result_text.split('\n')
-                translated_segments = [s.strip() for s in translated_segments if s.strip()]
-                translated_segments = [re.sub(r'^\[\d+\]\s*', '', s) for s in translated_segments]
-            
+            _bucket.acquire(_payload_tokens(payload))
+            if HAS_REQUESTS:
+                # Stream the completion and pick translations off as each
+                # array element completes instead of waiting for the full
+                # generation
+                translated_unique = []
+                for seg_text in _iter_json_translations(
+                        _stream_chat_content(url, headers, payload, timeout=180)):
+                    translated_unique.append(seg_text)
+                    print(f"  Segment {len(translated_unique)}/{len(unique_texts)} translated",
+                          file=sys.stderr)
+            else:
+                result = _post_json(url, data, headers, timeout=180)
+                result_text = result["choices"][0]["message"]["content"].strip()
+                translated_unique = _parse_json_translations(result_text)
+
+            if len(translated_unique) != len(unique_texts):
+                raise ValueError(f"model returned {len(translated_unique)} translations "
+                                 f"for {len(unique_texts)} segments")
+
+            for text, translation in zip(unique_texts, translated_unique):
+                _tx_cache_put(_cache_key(text, source_lang, target_lang), translation)
+
+            miss_translated = [translated_unique[unique[t]] for t in miss_texts]
+
+            for i, translation in zip(miss_idx, miss_translated):
+                translated_segments[i] = translation
+
             return {
                 "success": True,
                 "translations": translated_segments,
                 "source_lang": source_lang,
                 "target_lang": target_lang,
                 "segment_count": len(translated_segments),
+                "cached_count": len(segments) - len(miss_idx),
                 "model": "gpt-4o-mini"
             }
-            
+
         except urllib.error.HTTPError as e:
             last_error = f"HTTP {e.code}: {e.reason}"
             if e.code == 429:  # Rate limit
-                wait_time = (2 ** attempt) * 5  # Exponential backoff: 5, 10, 20 seconds
+                # Honor the server's Retry-After over the backoff guess
+                try:
+                    wait_time = float(e.headers.get("Retry-After"))
+                except (AttributeError, TypeError, ValueError):
+                    wait_time = (2 ** attempt) * 5  # Exponential backoff: 5, 10, 20 seconds
                 print(f"  Rate limited, waiting {wait_time}s before retry {attempt + 1}/{max_retries}...", file=sys.stderr)
                 time.sleep(wait_time)
             elif e.code >= 500:  # Server error
@@ -456,6 +1138,12 @@ Translation guidelines:
             wait_time = (2 ** attempt) * 3
             print(f"  Network error, waiting {wait_time}s before retry {attempt + 1}/{max_retries}...", file=sys.stderr)
             time.sleep(wait_time)
+        except ValueError as e:
+            # Malformed or miscounted JSON response; a regeneration
+            # usually fixes it
+            last_error = f"Bad response: {e}"
+            print(f"  {last_error}, retry {attempt + 1}/{max_retries}...", file=sys.stderr)
+            time.sleep(2 ** attempt)
         except Exception as e:
             last_error = str(e)
             break  # Don't retry unknown errors
@@ -479,62 +1167,144 @@ def translate_timed_segments(segments: list, source_lang: str, target_lang: str,
     Returns:
         dict with translated segments including preserved timestamps
     """
-    import time
-    
     texts = [seg.get('text', '') for seg in segments if seg.get('text', '').strip()]
-    
+
     if not texts:
         return {"success": False, "error": "No text segments to translate"}
-    
-    # Smaller batch size for more reliable processing
-    BATCH_SIZE = 20
-    all_translated = []
-    failed_batches = 0
-    max_batch_failures = 3
-    
-    for batch_start in range(0, len(texts), BATCH_SIZE):
-        batch_texts = texts[batch_start:batch_start + BATCH_SIZE]
-        batch_num = (batch_start // BATCH_SIZE) + 1
-        total_batches = (len(texts) + BATCH_SIZE - 1) // BATCH_SIZE
-        
-        # Try translating this batch with retries
-        result = translate_segments(batch_texts, source_lang, target_lang, context)
-        
-        if not result.get('success'):
-            failed_batches += 1
-            error_msg = result.get('error', 'Unknown error')
-            print(f"  Batch {batch_num}/{total_batches} failed: {error_msg}", file=sys.stderr)
-            
-            if failed_batches >= max_batch_failures:
+
+    if _same_language(source_lang, target_lang):
+        return _build_timed_result(segments, texts, source_lang, target_lang)
+
+    # Serve cached lines up front and collapse duplicate lines so each
+    # distinct miss is translated exactly once, then fanned back out
+    keys = [_cache_key(t, source_lang, target_lang) for t in texts]
+    hits = _tx_cache_get_many(keys)
+    miss_texts = []
+    key_slot = {}
+    for key, text in zip(keys, texts):
+        if key not in hits and key not in key_slot:
+            key_slot[key] = len(miss_texts)
+            miss_texts.append(text)
+
+    if len(miss_texts) < len(texts):
+        print(f"  Translation cache: {len(texts) - len(miss_texts)}/{len(texts)} "
+              f"lines served without API calls", file=sys.stderr)
+
+    if not miss_texts:
+        all_translated = [hits[k] for k in keys]
+        return _build_timed_result(segments, all_translated, source_lang, target_lang)
+
+    # Pack lines into token-budgeted batches instead of a fixed count
+    batches = _pack_batches(miss_texts)
+
+    # Seed completed batches from an interrupted run's checkpoint file.
+    # Entries are keyed by content hash, so batches that pack differently
+    # on resume simply miss instead of silently matching by position
+    partial_path = _partial_path(segments, source_lang, target_lang)
+    batch_keys = [_batch_key(b) for b in batches]
+    restored = _load_partial(partial_path)
+    batch_results = {i: restored[k] for i, k in enumerate(batch_keys)
+                     if k in restored and isinstance(restored[k], list)
+                     and len(restored[k]) == len(batches[i])}
+    if batch_results:
+        print(f"  Resuming: {len(batch_results)}/{len(batches)} batches "
+              f"restored from checkpoint", file=sys.stderr)
+    todo = [i for i in range(len(batches)) if i not in batch_results]
+
+    def _done_count():
+        return sum(len(tr) for tr in batch_results.values())
+
+    if HAS_AIOHTTP and todo:
+        cfg = _openai_config()
+        if cfg is None:
+            return {"success": False, "error": "OpenAI API key not found"}
+
+        payloads = [_build_openai_payload(batches[i], source_lang, target_lang, context)
+                    for i in todo]
+
+        print(f"  Translating {len(todo)} batches concurrently (limit {TRANSLATE_CONCURRENCY})", file=sys.stderr)
+        raw_results = _translate_batches_async(payloads, cfg["url"], cfg["headers"])
+
+        for batch_idx, result in zip(todo, raw_results):
+            batch_texts = batches[batch_idx]
+            if isinstance(result, Exception):
                 return {
                     "success": False,
-                    "error": f"Translation failed after {failed_batches} batch failures. Last error: {error_msg}",
-                    "partial_count": len(all_translated)
+                    "error": f"Batch {batch_idx + 1}/{len(batches)} failed: {result}",
+                    "partial_count": _done_count()
                 }
-            
-            # Wait before retrying the whole batch
-            time.sleep(10)
-            result = translate_segments(batch_texts, source_lang, target_lang, context)
-            
-            if not result.get('success'):
+
+            result_text = result["choices"][0]["message"]["content"].strip()
+            try:
+                parsed = _parse_json_translations(result_text)
+                if len(parsed) != len(batch_texts):
+                    raise ValueError(f"expected {len(batch_texts)} translations, "
+                                     f"got {len(parsed)}")
+            except ValueError as e:
                 return {
                     "success": False,
-                    "error": f"Batch {batch_num} failed after retry: {result.get('error', 'Unknown')}",
-                    "partial_count": len(all_translated)
+                    "error": f"Batch {batch_idx + 1}/{len(batches)} unparseable: {e}",
+                    "partial_count": _done_count()
                 }
-        
-        all_translated.extend(result.get('translations', []))
-        
-        current_count = min(batch_start + BATCH_SIZE, len(texts))
-        print(f"  Translated {current_count}/{len(texts)} segments", file=sys.stderr)
-        
-        # Add small delay between batches to prevent rate limiting
-        if batch_start + BATCH_SIZE < len(texts):
-            time.sleep(1.5)
-    
+            for batch_text, translation in zip(batch_texts, parsed):
+                _tx_cache_put(_cache_key(batch_text, source_lang, target_lang), translation)
+            batch_results[batch_idx] = parsed
+            _append_partial(partial_path, batch_keys[batch_idx], parsed)
+            print(f"  Translated {_done_count()}/{len(miss_texts)} segments", file=sys.stderr)
+    elif todo:
+        # No aiohttp: run the batches through a small thread pool instead
+        # of one-at-a-time; translate_segments retries and the token
+        # bucket throttles inside each worker
+        workers = min(TRANSLATE_CONCURRENCY, len(todo))
+        first_error = None
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(translate_segments, batches[i], source_lang,
+                                 target_lang, context): i for i in todo}
+            for future in as_completed(futures):
+                batch_idx = futures[future]
+                result = future.result()
+
+                if not result.get('success'):
+                    error_msg = result.get('error', 'Unknown error')
+                    print(f"  Batch {batch_idx + 1}/{len(batches)} failed: {error_msg}", file=sys.stderr)
+                    # Let the in-flight batches finish (and checkpoint)
+                    # before reporting the failure
+                    if first_error is None:
+                        first_error = f"Batch {batch_idx + 1}/{len(batches)} failed: {error_msg}"
+                    continue
+
+                batch_results[batch_idx] = result.get('translations', [])
+                _append_partial(partial_path, batch_keys[batch_idx], batch_results[batch_idx])
+
+                print(f"  Translated {_done_count()}/{len(miss_texts)} segments", file=sys.stderr)
+
+        if first_error is not None:
+            return {
+                "success": False,
+                "error": first_error,
+                "partial_count": _done_count()
+            }
+
+    miss_translated = []
+    for i in range(len(batches)):
+        miss_translated.extend(batch_results[i])
+
+    # Full success; the checkpoint has served its purpose
+    try:
+        os.remove(partial_path)
+    except OSError:
+        pass
+
+    all_translated = [hits[k] if k in hits else miss_translated[key_slot[k]]
+                      for k in keys]
+    return _build_timed_result(segments, all_translated, source_lang, target_lang)
+
+
+def _build_timed_result(segments: list, all_translated: list, source_lang: str, target_lang: str) -> dict:
+    """Reattach timestamps and speaker info to a flat list of translations."""
     translated_segments = []
     text_idx = 0
-    
+
     for seg in segments:
         if seg.get('text', '').strip():
             if text_idx < len(all_translated):
@@ -547,7 +1317,7 @@ def translate_timed_segments(segments: list, source_lang: str, target_lang: str,
                     'gender': seg.get('gender', seg.get('detected_gender'))
                 })
                 text_idx += 1
-    
+
     return {
         "success": True,
         "segments": translated_segments,
@@ -557,6 +1327,61 @@ def translate_timed_segments(segments: list, source_lang: str, target_lang: str,
     }
 
 
+def serve(socket_path: str):
+    """Serve translation requests over a Unix socket.
+
+    Keeps the process, the keep-alive HTTP session, the rate limiter and
+    every cache warm across requests, avoiding the ~500ms interpreter
+    cold start of one subprocess per file. Protocol is one JSON object
+    per line, e.g. {"cmd": "translate", "text": ..., "src": ..., "tgt": ...};
+    the reply is the usual result dict, one JSON line per request.
+    """
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    req = json.loads(line)
+                    cmd = req.get("cmd", "translate")
+                    if cmd == "translate":
+                        result = translate_text(
+                            req["text"], req.get("src", "en"), req["tgt"],
+                            req.get("context", ""), req.get("engine", "auto"))
+                    elif cmd == "translate-timed":
+                        result = translate_timed_segments(
+                            req["segments"], req.get("src", "en"), req["tgt"],
+                            req.get("context", ""))
+                    elif cmd == "ping":
+                        result = {"success": True, "pong": True}
+                    else:
+                        result = {"success": False, "error": f"Unknown command: {cmd}"}
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                self.wfile.write(json.dumps(result).encode('utf-8') + b"\n")
+                self.wfile.flush()
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with Server(socket_path, Handler) as server:
+        print(f"Translation daemon listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            try:
+                os.unlink(socket_path)
+            except OSError:
+                pass
+
+
 def main():
     """CLI interface for translation service."""
     if len(sys.argv) < 2:
@@ -565,7 +1390,8 @@ def main():
             "commands": {
                 "translate": "<input_file> <source_lang> <target_lang> <output_file> [context]",
                 "list-languages": "",
-                "check": ""
+                "check": "",
+                "serve": "[--socket /tmp/tx.sock]"
             }
         }))
         sys.exit(1)
@@ -659,6 +1485,15 @@ def main():
         print(json.dumps(result))
         sys.exit(0 if result.get("success") else 1)
     
+    elif command == "serve":
+        socket_path = os.environ.get("TRANSLATE_SOCKET", "/tmp/tx.sock")
+        args = sys.argv[2:]
+        if "--socket" in args:
+            socket_path = args[args.index("--socket") + 1]
+        elif args:
+            socket_path = args[0]
+        serve(socket_path)
+
     else:
         print(json.dumps({"error": f"Unknown command: {command}"}))
         sys.exit(1)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Thin client for the translate.py Unix-socket daemon.
+Opens the socket, writes one JSON request line, prints the JSON reply —
+~1ms of overhead instead of a full Python cold start per file.
+Start the daemon first with: python translate.py serve
+"""
+import sys
+import os
+import json
+import socket
+
+DEFAULT_SOCKET = os.environ.get("TRANSLATE_SOCKET", "/tmp/tx.sock")
+
+
+def request(payload: dict, socket_path: str = DEFAULT_SOCKET) -> dict:
+    """Send one JSON request line to the daemon and return the reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload).encode('utf-8') + b"\n")
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+    return json.loads(buf)
+
+
+def main():
+    if len(sys.argv) < 4:
+        print(json.dumps({
+            "error": "Usage: python translate_cli.py <text> <source_lang> <target_lang> [context] [socket]"
+        }))
+        sys.exit(1)
+
+    text = sys.argv[1]
+    source_lang = sys.argv[2]
+    target_lang = sys.argv[3]
+    context = sys.argv[4] if len(sys.argv) > 4 else ""
+    socket_path = sys.argv[5] if len(sys.argv) > 5 else DEFAULT_SOCKET
+
+    try:
+        result = request({
+            "cmd": "translate",
+            "text": text,
+            "src": source_lang,
+            "tgt": target_lang,
+            "context": context
+        }, socket_path)
+    except OSError as e:
+        result = {
+            "success": False,
+            "error": f"Cannot reach translation daemon at {socket_path}: {e}"
+        }
+
+    print(json.dumps(result))
+    sys.exit(0 if result.get("success") else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,17 @@ Intelligently selects appropriate voices for dubbing based on:
 """
 
 import sys
+import os
 import json
-import argparse
+import functools
 from typing import Dict, List, Optional, Tuple
 
+# Assignments persisted here so repeat CLI invocations keep the same
+# speaker -> voice mapping instead of starting from scratch each time
+VOICE_MAP_CACHE = os.environ.get(
+    "VOICE_MAP_CACHE",
+    os.path.join(os.path.expanduser("~"), ".rampage", "voice_map.json"))
+
 # Comprehensive Edge TTS voice database by language
 # Using stable neural voices that work reliably with Edge TTS service
 EDGE_TTS_VOICES = {
@@ -166,11 +173,95 @@ EDGE_TTS_VOICES = {
     }
 }
 
+# Flat lookup tables derived from EDGE_TTS_VOICES at import time. Each
+# language's voices get a fixed bit position (list order, male then
+# female), so the used/gender/style sets become integer bitmasks: picking
+# a voice is mask arithmetic plus one tuple index instead of string-set
+# hashing per candidate
+_LANG_VOICE_NAMES: Dict[str, Tuple[str, ...]] = {}
+_VOICE_BIT: Dict[Tuple[str, str], int] = {}
+_GENDER_MASK: Dict[Tuple[str, str], int] = {}
+_STYLE_MASK: Dict[Tuple[str, str, str], int] = {}
+for _lang, _genders in EDGE_TTS_VOICES.items():
+    _names = []
+    for _gender in ("male", "female"):
+        for _voice in _genders.get(_gender, []):
+            _bit = 1 << len(_names)
+            _VOICE_BIT[(_lang, _voice["name"])] = _bit
+            _GENDER_MASK[(_lang, _gender)] = _GENDER_MASK.get((_lang, _gender), 0) | _bit
+            _skey = (_lang, _gender, _voice["style"])
+            _STYLE_MASK[_skey] = _STYLE_MASK.get(_skey, 0) | _bit
+            _names.append(_voice["name"])
+    _LANG_VOICE_NAMES[_lang] = tuple(_names)
+
+_FALLBACK_VOICE = "en-US-JennyNeural"
+
+
+@functools.lru_cache(maxsize=1024)
+def _pick_voice(lang_code: str, gender: str, style: str, used_mask: int) -> Optional[str]:
+    """
+    Pick a voice name for a (language, gender, style, used-mask) combination.
+    Pure function of its arguments, so repeated lookups for the same handful
+    of speakers hit the LRU cache instead of rescanning the voice lists.
+    """
+    gender_mask = _GENDER_MASK.get((lang_code, gender), 0)
+    if not gender_mask:
+        gender = "female" if gender == "male" else "male"
+        gender_mask = _GENDER_MASK.get((lang_code, gender), 0)
+
+    if not gender_mask:
+        return None
+
+    names = _LANG_VOICE_NAMES[lang_code]
+
+    # Prefer unused voices, or match style; lowest set bit is the first
+    # voice in list order
+    pool = gender_mask if style == "general" else _STYLE_MASK.get((lang_code, gender, style), 0)
+    free = pool & ~used_mask
+    if free:
+        return names[(free & -free).bit_length() - 1]
+
+    # If all voices used, just pick first matching style
+    styled = _STYLE_MASK.get((lang_code, gender, style), 0)
+    if styled:
+        return names[(styled & -styled).bit_length() - 1]
+    return names[(gender_mask & -gender_mask).bit_length() - 1]
+
+
 # Voice characteristics for consistent character assignment
 class VoiceAssigner:
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None):
         self.speaker_voice_map: Dict[str, str] = {}
-        self.used_voices: Dict[str, set] = {}  # Per language
+        self.used_voices: Dict[str, int] = {}  # Per-language bitmask over _LANG_VOICE_NAMES
+        self.cache_path = cache_path
+        if cache_path:
+            self._load()
+
+    def _load(self):
+        """Restore persisted assignments; a bad or missing file starts fresh."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.speaker_voice_map = dict(state.get("speaker_voice_map", {}))
+            self.used_voices = {k: int(v) for k, v in state.get("used_voices", {}).items()}
+        except Exception:
+            pass
+
+    def save(self):
+        """Persist assignments so the next invocation reuses them."""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "speaker_voice_map": self.speaker_voice_map,
+                    "used_voices": self.used_voices
+                }, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not save voice map: {e}", file=sys.stderr)
     
     def get_voice_for_speaker(
         self,
@@ -202,43 +293,22 @@ class VoiceAssigner:
         if lang_code not in EDGE_TTS_VOICES:
             lang_code = "en"  # Fallback to English
         
-        voices = EDGE_TTS_VOICES[lang_code].get(gender, [])
-        if not voices:
-            voices = EDGE_TTS_VOICES[lang_code].get("female" if gender == "male" else "male", [])
-        
-        if not voices:
+        # Track used voices for this language to maximize variety
+        used_mask = self.used_voices.get(lang_code, 0)
+
+        selected_voice = _pick_voice(lang_code, gender, style, used_mask)
+        if selected_voice is None:
             return {
-                "voice": "en-US-JennyNeural",  # Ultimate fallback
+                "voice": _FALLBACK_VOICE,  # Ultimate fallback
                 "cached": False,
                 "speaker_id": speaker_id,
                 "fallback": True
             }
-        
-        # Track used voices for this language to maximize variety
-        if lang_code not in self.used_voices:
-            self.used_voices[lang_code] = set()
-        
-        # Prefer unused voices, or match style
-        selected_voice = None
-        for voice in voices:
-            if voice["name"] not in self.used_voices[lang_code]:
-                if style == "general" or voice.get("style") == style:
-                    selected_voice = voice["name"]
-                    break
-        
-        # If all voices used, just pick first matching style
-        if not selected_voice:
-            for voice in voices:
-                if voice.get("style") == style:
-                    selected_voice = voice["name"]
-                    break
-            if not selected_voice:
-                selected_voice = voices[0]["name"]
-        
+
         # Cache the assignment
         self.speaker_voice_map[cache_key] = selected_voice
-        self.used_voices[lang_code].add(selected_voice)
-        
+        self.used_voices[lang_code] = used_mask | _VOICE_BIT[(lang_code, selected_voice)]
+
         return {
             "voice": selected_voice,
             "cached": False,
@@ -279,7 +349,7 @@ class VoiceAssigner:
             "success": True,
             "language": target_language,
             "assignments": assignments,
-            "unique_voices_used": len(self.used_voices.get(target_language[:2].lower(), set()))
+            "unique_voices_used": bin(self.used_voices.get(target_language[:2].lower(), 0)).count("1")
         }
 
 
@@ -302,6 +372,12 @@ def get_voices_for_language(language: str) -> Dict:
 
 
 def main():
+    # Fast path: no argparse import for the flag that needs no arguments
+    if '--list-languages' in sys.argv[1:]:
+        print(json.dumps({"languages": get_available_languages()}, indent=2))
+        return
+
+    import argparse
     parser = argparse.ArgumentParser(description='Voice selector for dubbing')
     parser.add_argument('--language', '-l', default='en', help='Target language')
     parser.add_argument('--gender', '-g', default='unknown', help='Speaker gender')
@@ -320,8 +396,11 @@ def main():
         print(json.dumps(get_voices_for_language(args.language), indent=2))
         return
     
-    # Single voice assignment
-    assigner = VoiceAssigner()
+    # Single voice assignment, persisted so the same speaker keeps the
+    # same voice across separate invocations
+    assigner = VoiceAssigner(cache_path=VOICE_MAP_CACHE)
+    import atexit
+    atexit.register(assigner.save)
     result = assigner.get_voice_for_speaker(
         speaker_id=args.speaker_id,
         language=args.language,